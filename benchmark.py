@@ -0,0 +1,413 @@
+# Performance measurements for the banking chatbot.
+#   python benchmark.py suite --output results.json
+#   python benchmark.py memory --workers 4
+#   python benchmark.py linear
+#   python benchmark.py hashing
+import argparse
+import asyncio
+import json
+import os
+import pickle
+import platform
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from chatbot import DEFAULT_BATCH_SIZE, DEFAULT_HASH_FEATURES, BankingChatbot, HashedTfidfVectorizer, LinearIntentModel
+from server import ChatClient
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def process_memory(pid):
+    # Resident, proportional and private memory in KiB (Linux only)
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as rollup:
+        for line in rollup:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    return {
+        'rss_kib': fields['Rss'],
+        'pss_kib': fields['Pss'],
+        'private_kib': fields['Private_Clean'] + fields['Private_Dirty'],
+    }
+
+
+def child_pids(pid):
+    with open(f'/proc/{pid}/task/{pid}/children') as children:
+        return [int(child) for child in children.read().split()]
+
+
+async def wait_until_serving(port, timeout=120):
+    deadline = time.monotonic() + timeout
+    while True:
+        client = ChatClient(port=port)
+        try:
+            await client.request('GET', '/health')
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+        finally:
+            await client.close()
+
+
+async def exercise(port, connections, messages):
+    # Spread traffic over several connections so every worker answers some requests
+    clients = [ChatClient(port=port) for _ in range(connections)]
+    try:
+        await asyncio.gather(*(client.chat(message) for client in clients for message in messages[:1]))
+        for message in messages:
+            await asyncio.gather(*(client.chat(message) for client in clients))
+    finally:
+        for client in clients:
+            await client.close()
+
+
+def summarize(samples):
+    return {
+        'workers': len(samples),
+        'per_worker': samples,
+        'mean_private_kib': sum(sample['private_kib'] for sample in samples) / len(samples),
+        'mean_pss_kib': sum(sample['pss_kib'] for sample in samples) / len(samples),
+        'total_pss_kib': sum(sample['pss_kib'] for sample in samples),
+    }
+
+
+def benchmark_memory(workers=4, messages=('How can I activate my debit card?', 'lost card abroad', 'loan interest')):
+    # Compare N pre-forked workers sharing one model with N independent processes each loading their own
+    server_script = os.path.join(HERE, 'server.py')
+    messages = list(messages)
+    results = {}
+
+    port = free_port()
+    parent = subprocess.Popen([sys.executable, server_script, '--port', str(port), '--workers', str(workers)],
+                              cwd=HERE, stdout=subprocess.DEVNULL)
+    try:
+        asyncio.run(wait_until_serving(port))
+        asyncio.run(exercise(port, workers * 4, messages))
+        results['prefork'] = summarize([process_memory(pid) for pid in child_pids(parent.pid)])
+    finally:
+        parent.terminate()
+        parent.wait()
+
+    ports = [free_port() for _ in range(workers)]
+    processes = [subprocess.Popen([sys.executable, server_script, '--port', str(port)],
+                                  cwd=HERE, stdout=subprocess.DEVNULL) for port in ports]
+    try:
+        for port in ports:
+            asyncio.run(wait_until_serving(port))
+            asyncio.run(exercise(port, 4, messages))
+        results['independent'] = summarize([process_memory(process.pid) for process in processes])
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+    results['private_kib_saved_per_worker'] = (results['independent']['mean_private_kib']
+                                               - results['prefork']['mean_private_kib'])
+    return results
+
+
+def synthetic_dataset(n_intents, vocab_size, examples_per_intent=2, words_per_query=8, seed=42):
+    # FAQ-like (query, response) pairs over a made-up vocabulary, each intent has a few topic words
+    rng = np.random.default_rng(seed)
+    vocabulary = np.array([f'term{index}' for index in range(vocab_size)])
+    dataset = []
+    for intent in range(n_intents):
+        topic = rng.choice(vocab_size, size=words_per_query, replace=False)
+        for _ in range(examples_per_intent):
+            words = np.where(rng.random(words_per_query) < 0.7, topic, rng.choice(vocab_size, size=words_per_query))
+            dataset.append((' '.join(vocabulary[words]), f'Answer number {intent}.'))
+    return dataset
+
+
+def percentiles(timings):
+    return {'p50_ms': float(np.percentile(timings, 50) * 1000), 'p99_ms': float(np.percentile(timings, 99) * 1000)}
+
+
+def latency(function, argument, repeat=200):
+    function(argument)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(argument)
+        timings.append(time.perf_counter() - start)
+    return percentiles(timings)
+
+
+def throughput(function, argument, repeat=5):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function(argument)
+    return argument.shape[0] * repeat / (time.perf_counter() - start)
+
+
+def benchmark_linear(scales=((200, 2000), (1000, 5000), (2000, 10000))):
+    # Term-indexed linear scoring against scikit-learn's decision_function and a full dense X @ W product,
+    # as the number of intents and the vocabulary grow
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.svm import LinearSVC
+
+    results = []
+    for n_intents, vocab_size in scales:
+        dataset = synthetic_dataset(n_intents, vocab_size)
+        queries, responses = zip(*dataset)
+        vectorizer = TfidfVectorizer()
+        X = vectorizer.fit_transform(queries)
+        estimator = LinearSVC(random_state=42).fit(X, responses)
+        model = LinearIntentModel.from_estimator(estimator)
+        dense_coef = np.ascontiguousarray(estimator.coef_.T)
+
+        single = X[:1]
+        batch = X[:512]
+        assert np.array_equal(model.decision_function(X), X @ dense_coef + estimator.intercept_)
+        assert np.array_equal(model.predict(X), estimator.predict(X))
+        results.append({
+            'intents': n_intents,
+            'vocabulary': X.shape[1],
+            'sklearn_single': latency(estimator.decision_function, single),
+            'dense_single': latency(lambda X: X @ dense_coef + estimator.intercept_, single),
+            'indexed_single': latency(model.decision_function, single),
+            'sklearn_batch_per_s': throughput(estimator.decision_function, batch),
+            'dense_batch_per_s': throughput(lambda X: X @ dense_coef + estimator.intercept_, batch),
+            'indexed_batch_per_s': throughput(model.decision_function, batch),
+            'dense_weights_kib': dense_coef.nbytes / 1024,
+            'indexed_weights_kib': (model.weight_rows.nbytes + model.weights.nbytes) / 1024,
+        })
+    return results
+
+
+def directory_size(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def benchmark_hashing(hash_features=DEFAULT_HASH_FEATURES, scales=((300, 5000, 8), (300, 200000, 64)),
+                      examples_per_intent=4):
+    # Vocabulary TF-IDF against hashed TF-IDF over (intents, vocabulary, words per query) scales:
+    # held-out accuracy of every model, transform speed and the vectorizer's footprint.
+    # The last example of every synthetic intent is held out
+    import tracemalloc
+
+    results = []
+    for n_intents, vocab_size, words_per_query in scales:
+        dataset = synthetic_dataset(n_intents, vocab_size, examples_per_intent=examples_per_intent,
+                                    words_per_query=words_per_query)
+        train = [pair for index, pair in enumerate(dataset) if index % examples_per_intent]
+        test = dataset[examples_per_intent - 1::examples_per_intent]
+        messages = [query for query, _ in test]
+        batch = (messages * (DEFAULT_BATCH_SIZE // len(messages) + 1))[:DEFAULT_BATCH_SIZE]
+        for features in (None, hash_features):
+            bot = BankingChatbot(hash_features=features)
+            bot.train_ml_models(train)
+            # Heap taken by the first message: the terms looked up so far for TF-IDF, the hasher for hashing
+            tracemalloc.start()
+            bot.vectorize(messages[:1])
+            heap_bytes = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            predictions = bot.predict_vector(bot.vectorize(messages), ('svm', 'rf', 'knn'))
+            accuracy = {name: float(np.mean([bot.intents[intent] == response
+                                             for intent, (_, response) in zip(intents, test)]))
+                        for name, intents in predictions.items()}
+            start = time.perf_counter()
+            for _ in range(5):
+                bot.vectorize(batch)
+            batch_per_s = 5 * len(batch) / (time.perf_counter() - start)
+
+            if isinstance(bot.vectorizer, HashedTfidfVectorizer):
+                vectorizer_bytes = bot.vectorizer.idf.nbytes
+                pickled = pickle.dumps((bot.vectorizer._hasher, bot.vectorizer.idf))
+            else:
+                from sklearn.feature_extraction.text import TfidfVectorizer
+
+                terms, idf = bot.vocabulary()
+                vectorizer_bytes = terms.blob.nbytes + terms.offsets.nbytes + idf.nbytes
+                # A scikit-learn vectorizer over the same vocabulary, with the dict a pickled model carries
+                reference = TfidfVectorizer(vocabulary=list(terms))
+                reference.idf_ = idf
+                pickled = pickle.dumps(reference)
+            with tempfile.TemporaryDirectory() as directory:
+                bot.save_model(os.path.join(directory, 'model'))
+                bundle_bytes = directory_size(os.path.join(directory, 'model'))
+            results.append({
+                'intents': n_intents,
+                'vocabulary': vocab_size,
+                'words_per_query': words_per_query,
+                'features': 'hashed' if features else 'vocabulary',
+                'n_features': len(bot.vectorizer.idf),
+                'train_seconds': bot.train_timings['total'],
+                'accuracy': accuracy,
+                'transform_single': latency(bot.vectorize, messages[:1]),
+                'transform_batch_per_s': batch_per_s,
+                'vectorizer_kib': vectorizer_bytes / 1024,
+                'vectorizer_heap_kib': heap_bytes / 1024,
+                'vectorizer_pickled_kib': len(pickled) / 1024,
+                'bundle_kib': bundle_bytes / 1024,
+            })
+    return results
+
+
+def scaled_dataset(dataset, factor):
+    # The FAQ dataset with factor times as many intents: copy k marks its queries with an extra term
+    # and gets its own variant of every response
+    scaled = list(dataset)
+    for copy in range(1, factor):
+        scaled.extend((f'{query} plan{copy}', f'{response} (plan {copy})') for query, response in dataset)
+    return scaled
+
+
+def test_messages(dataset, count, words=None, seed=42):
+    # Queries with a greeting added, so they miss the exact-match table and reach the models.
+    # With words set, queries are chained until each message has at least that many words
+    rng = np.random.default_rng(seed)
+    queries = [query for query, _ in dataset]
+    messages = []
+    for _ in range(count):
+        parts = ['hello']
+        while len(parts) < (words or 2):
+            parts.extend(queries[rng.integers(len(queries))].split())
+        messages.append(' '.join(parts))
+    return messages
+
+
+def message_latency(function, messages):
+    function(messages[0])
+    timings = []
+    for message in messages:
+        start = time.perf_counter()
+        function(message)
+        timings.append(time.perf_counter() - start)
+    return percentiles(timings)
+
+
+def import_time(repeat=5):
+    # Median wall-clock seconds for a fresh interpreter to import chatbot
+    code = 'import time; start = time.perf_counter(); import chatbot; print(time.perf_counter() - start)'
+    timings = [float(subprocess.run([sys.executable, '-c', code], cwd=HERE, check=True, capture_output=True,
+                                    text=True).stdout) for _ in range(repeat)]
+    return float(np.median(timings))
+
+
+def cold_start(path, message):
+    # Seconds a fresh interpreter takes to import chatbot, load a saved bundle and answer one message
+    code = ('import sys, time; start = time.perf_counter(); from chatbot import BankingChatbot; '
+            'bot = BankingChatbot(); assert bot.load_model(sys.argv[1]); bot.respond(sys.argv[2]); '
+            'print(time.perf_counter() - start)')
+    return float(subprocess.run([sys.executable, '-c', code, path, message], cwd=HERE, check=True,
+                                capture_output=True, text=True).stdout)
+
+
+def benchmark_scale(factor, long_words=200, messages=300):
+    # Train, save, cold-load and query the chatbot on the dataset scaled to factor times the intents.
+    # Meant to run in a fresh process, so peak RSS belongs to this scale alone
+    from faq_dataset import dataset
+
+    scaled = scaled_dataset(dataset, factor)
+    bot = BankingChatbot()
+    bot.train_ml_models(scaled)
+    result = {
+        'scale': factor,
+        'examples': len(scaled),
+        'intents': len(bot.intents),
+        'train_seconds': bot.train_timings,
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'model')
+        bot.save_model(path)
+        result['cold_start_seconds'] = cold_start(path, test_messages(scaled, 1)[0])
+        bot = BankingChatbot()
+        bot.load_model(path)
+
+        short = test_messages(scaled, messages)
+        long = test_messages(scaled, messages, words=long_words)
+        result['respond'] = message_latency(bot.respond, short)
+        result['respond_long'] = message_latency(bot.respond, long)
+        batch = test_messages(scaled, DEFAULT_BATCH_SIZE * 4)
+        start = time.perf_counter()
+        for offset in range(0, len(batch), DEFAULT_BATCH_SIZE):
+            bot.respond_batch(batch[offset:offset + DEFAULT_BATCH_SIZE])
+        result['batch_messages_per_s'] = len(batch) / (time.perf_counter() - start)
+    # ru_maxrss is in KiB on Linux
+    result['peak_rss_kib'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return result
+
+
+def benchmark_suite(scales=(1, 10, 100), memory_limit=None):
+    # Every scale runs in its own process under an optional address-space limit in bytes;
+    # a scale that fails, for example by running out of memory, is reported with its error
+    results = {
+        'commit': subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=HERE, capture_output=True,
+                                 text=True).stdout.strip(),
+        'python': platform.python_version(),
+        'cpu_count': os.cpu_count(),
+        'import_seconds': import_time(),
+        'scales': [],
+    }
+    for factor in scales:
+        command = [sys.executable, os.path.join(HERE, 'benchmark.py'), 'scale', str(factor)]
+        if memory_limit:
+            command += ['--memory-limit', str(memory_limit)]
+        process = subprocess.run(command, cwd=HERE, capture_output=True, text=True)
+        if process.returncode == 0:
+            results['scales'].append(json.loads(process.stdout))
+        else:
+            error = process.stderr.strip().splitlines()[-1:] or [f'exit status {process.returncode}']
+            results['scales'].append({'scale': factor, 'error': error[0]})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the banking chatbot')
+    commands = parser.add_subparsers(dest='command', required=True)
+    suite = commands.add_parser('suite', help='import, training, latency, throughput and peak RSS at several scales')
+    suite.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100],
+                       help='multiples of the built-in dataset\'s intents')
+    suite.add_argument('--memory-limit-gib', type=float, help='address-space limit for each scale')
+    suite.add_argument('--output', help='write the JSON results here instead of printing them')
+    scale = commands.add_parser('scale', help='one scale of the suite, run by the suite in a fresh process')
+    scale.add_argument('factor', type=int)
+    scale.add_argument('--memory-limit', type=int)
+    memory = commands.add_parser('memory', help='resident memory of pre-forked vs independent workers')
+    memory.add_argument('--workers', type=int, default=4)
+    commands.add_parser('linear', help='term-indexed linear scorer against the scikit-learn path')
+    hashing = commands.add_parser('hashing', help='hashed against vocabulary TF-IDF features')
+    hashing.add_argument('--hash-features', type=int, default=DEFAULT_HASH_FEATURES)
+    args = parser.parse_args()
+
+    if args.command == 'suite':
+        limit = int(args.memory_limit_gib * 2 ** 30) if args.memory_limit_gib else None
+        results = json.dumps(benchmark_suite(args.scales, limit), indent=2)
+        if args.output:
+            with open(args.output, 'w') as output:
+                output.write(results + '\n')
+        else:
+            print(results)
+    elif args.command == 'scale':
+        if args.memory_limit:
+            resource.setrlimit(resource.RLIMIT_AS, (args.memory_limit, args.memory_limit))
+        print(json.dumps(benchmark_scale(args.factor)))
+    elif args.command == 'memory':
+        print(json.dumps(benchmark_memory(args.workers), indent=2))
+    elif args.command == 'linear':
+        print(json.dumps(benchmark_linear(), indent=2))
+    elif args.command == 'hashing':
+        print(json.dumps(benchmark_hashing(args.hash_features), indent=2))
+
+
+if __name__ == '__main__':
+    main()
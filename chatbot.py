@@ -1,961 +1,1467 @@
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.model_selection import train_test_split
-from sklearn.svm import SVC
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import accuracy_score
-from imblearn.over_sampling import RandomOverSampler
-from sklearn.datasets import make_classification
-from imblearn.under_sampling import RandomUnderSampler
-from termcolor import colored
+# scikit-learn, imbalanced-learn and joblib are imported where they are used, so importing
+# this module stays cheap for servers, tests and benchmarks that only need BankingChatbot
+from bisect import bisect_left
+from collections import OrderedDict
+from itertools import islice
+import hashlib
+import json
+import numpy as np
+import os
+import re
+import shutil
+import struct
+import sys
 import time
 
 
+# Bump whenever the layout of the saved model bundle changes
+MODEL_BUNDLE_VERSION = 13
+# Models consulted by respond, in the order their answers are reported
+DEFAULT_MODELS = ('svm', 'rf')
+MODEL_LABELS = {'svm': 'SVM', 'rf': 'Random Forest', 'knn': 'Nearest Neighbour'}
+# In cascade mode the SVM answers alone when its best score beats the runner-up by at least this
+# margin, otherwise the fallback model decides
+DEFAULT_CASCADE_MARGIN = 0.2
+DEFAULT_CASCADE_FALLBACK = 'knn'
+# Messages vectorized and predicted together by respond_many
+DEFAULT_BATCH_SIZE = 512
+# Width of the hashed feature space, when BankingChatbot is asked to hash terms instead of keeping a vocabulary
+DEFAULT_HASH_FEATURES = 2 ** 18
+# The linear model keeps a weight row for every feature once at least this share of them has weights,
+# so scoring is the plain X @ weights product; sparser feature spaces (hashing) only store the used rows
+DENSE_WEIGHTS_ABOVE = 0.5
+# (query, response) pairs read and vectorized at a time while training
+DEFAULT_INGEST_CHUNK = 4096
+# Trees grown on the updated corpus each time examples are added without a full retrain
+DEFAULT_EXTRA_TREES = 10
+# Trees in the Random Forest when it is fitted from scratch
+FOREST_TREES = 100
+# Pause after each word when the CLI renders text, the server and respond never wait
+WORD_DELAY = 0.03
+# Upper bounds in seconds of the latency histogram buckets, a final +Inf bucket catches the rest
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# The bundle is a directory holding a manifest.json and one .npy file per array
+MODEL_BUNDLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'banking_chatbot_model')
+# The built-in FAQ dataset, one {"query": ..., "response": ...} object per line
+DATASET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'banking_faq.jsonl')
+
+
+_PUNCTUATION = re.compile(r'[^\w\s]+')
+
+
+def normalize_query(text):
+    # Fold case, punctuation and whitespace so near-verbatim copies of a question compare equal
+    return ' '.join(_PUNCTUATION.sub(' ', text.lower()).split())
+
+
+def pair_digest(query, response):
+    digest = hashlib.sha256(query.encode('utf-8') + b'\0' + response.encode('utf-8'))
+    return int.from_bytes(digest.digest(), 'big')
+
+
+def dataset_hash(dataset):
+    # Stable fingerprint of the (query, response) pairs used for training. It is the sum of the pairs'
+    # SHA-256 digests, so adding or replacing pairs updates it without rehashing the whole dataset
+    return update_dataset_hash(f'{0:064x}', added=dataset)
+
+
+def update_dataset_hash(current, added=(), removed=()):
+    total = int(current, 16)
+    for query, response in added:
+        total += pair_digest(query, response)
+    for query, response in removed:
+        total -= pair_digest(query, response)
+    return f'{total % 2 ** 256:064x}'
+
+
+def read_dataset(path):
+    # Stream (query, response) pairs from a JSONL file of {"query": ..., "response": ...} objects
+    # or from a CSV file with query and response columns
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.jsonl', '.ndjson'):
+        with open(path, encoding='utf-8') as lines:
+            for line in lines:
+                if line.strip():
+                    record = json.loads(line)
+                    yield record['query'], record['response']
+    elif extension == '.csv':
+        import csv
+
+        with open(path, newline='', encoding='utf-8') as rows:
+            for record in csv.DictReader(rows):
+                yield record['query'], record['response']
+    else:
+        raise ValueError(f'unsupported dataset format: {path}')
+
+
+def ingest_dataset(source):
+    # The training pipeline's front half: parse, normalize whitespace and drop empty or repeated pairs.
+    # source is a JSONL/CSV path or any iterable of (query, response) pairs; either way pairs flow
+    # through one at a time and only a digest of each pair seen is kept
+    pairs = read_dataset(os.fspath(source)) if isinstance(source, (str, os.PathLike)) else source
+    seen = set()
+    for query, response in pairs:
+        query, response = ' '.join(query.split()), ' '.join(response.split())
+        if not query or not response:
+            continue
+        key = pair_digest(normalize_query(query), response)
+        if key not in seen:
+            seen.add(key)
+            yield query, response
+
+
+def count_terms(queries, terms, term_ids, analyzer):
+    # Term counts of the queries as CSR rows. Unseen terms are appended to terms and term_ids
+    data, indices, indptr = [], [], [0]
+    for query in queries:
+        counts = {}
+        for term in analyzer(query):
+            term_id = term_ids.setdefault(term, len(terms))
+            if term_id == len(terms):
+                terms.append(term)
+            counts[term_id] = counts.get(term_id, 0) + 1
+        indices.extend(sorted(counts))
+        data.extend(counts[term_id] for term_id in sorted(counts))
+        indptr.append(len(indices))
+    return np.array(data, dtype=np.int64), np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int64)
+
+
+def tfidf_from_counts(counts):
+    # Smoothed IDF and L2-normalised TF-IDF rows, computed the way TfidfVectorizer does
+    from sklearn.preprocessing import normalize
+
+    document_frequency = np.bincount(counts.indices, minlength=counts.shape[1])
+    idf = np.log((1 + counts.shape[0]) / (1 + document_frequency)) + 1
+    # Columns no training query uses (only possible with hashing) get no weight, so unseen terms are
+    # ignored like out-of-vocabulary words instead of taking most of a message's norm
+    idf[document_frequency == 0] = 0.0
+    X = counts.astype(np.float64)
+    X.data *= idf[X.indices]
+    return idf, normalize(X, copy=False)
+
+
+class StringTable:
+    # Strings stored UTF-8 encoded back to back in a single buffer; string i is the slice
+    # blob[offsets[i]:offsets[i + 1]]. Both are plain arrays, so the table can be memory-mapped
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    @classmethod
+    def pack(cls, strings):
+        encoded = [string.encode('utf-8') for string in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(chunk) for chunk in encoded], out=offsets[1:])
+        blob = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        return cls(blob, offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        return self.blob[self.offsets[index]:self.offsets[index + 1]].tobytes().decode('utf-8')
+
+    def __iter__(self):
+        data = self.blob.tobytes()
+        offsets = self.offsets.tolist()
+        for start, end in zip(offsets, offsets[1:]):
+            yield data[start:end].decode('utf-8')
+
+    def search(self, key, order=None):
+        # Index of key, or -1, by binary search over the table's strings in sorted order: their own
+        # order, or the one given by the order permutation. Only the probed strings are read, so a
+        # lookup costs the same right after loading as later on
+        target = key.encode('utf-8')
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            index = middle if order is None else order[middle]
+            # UTF-8 bytes sort in the same order as the strings they encode
+            if self.blob[self.offsets[index]:self.offsets[index + 1]].tobytes() < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self):
+            index = int(low if order is None else order[low])
+            if self.blob[self.offsets[index]:self.offsets[index + 1]].tobytes() == target:
+                return index
+        return -1
+
+
+def sorted_order(strings):
+    # The permutation listing strings in sorted order, or None when they already are
+    order = sorted(range(len(strings)), key=strings.__getitem__)
+    if all(index == position for position, index in enumerate(order)):
+        return None
+    return np.array(order, dtype=np.int64)
+
+
+class IntentTable(StringTable):
+    # Every distinct response is stored once, intent i is the i-th string of the table
+    @classmethod
+    def compile(cls, responses):
+        # Returns the table and the intent ID of every response. IDs follow the sorted response
+        # order, the same class order the estimators used when trained on the strings themselves
+        distinct = sorted(set(responses))
+        intent_ids = {response: intent_id for intent_id, response in enumerate(distinct)}
+        labels = np.fromiter((intent_ids[response] for response in responses), dtype=np.int32, count=len(responses))
+        return cls.pack(distinct), labels
+
+
+class MappedLookup:
+    # Read-only dict restored from a bundle: keys is a sorted string table searched in place, and
+    # only the keys found so far are remembered in a dict
+    def __init__(self, keys, values):
+        self.keys = keys
+        self.values = values
+        self._found = {}
+
+    def get(self, key, default=None):
+        value = self._found.get(key)
+        if value is None:
+            index = self.keys.search(key)
+            if index < 0:
+                return default
+            value = self._found[key] = int(self.values[index])
+        return value
+
+
+class MappedTfidfVectorizer:
+    # TF-IDF vectorizer over a packed vocabulary in feature order. Terms are searched in the table,
+    # sorted through order when terms were appended after training, so no vocabulary dict is ever
+    # built; the terms found so far are remembered. The output is identical to TfidfVectorizer.transform
+    def __init__(self, terms, idf, order=None):
+        self.terms = terms
+        self.idf = idf
+        self.order = order
+        self._found = {}
+        self._analyzer = None
+
+    def index(self, term):
+        index = self._found.get(term)
+        if index is None:
+            index = self.terms.search(term, self.order)
+            if index >= 0:
+                self._found[term] = index
+        return index
+
+    def transform(self, messages):
+        from scipy.sparse import csr_matrix
+        from sklearn.preprocessing import normalize
+
+        if self._analyzer is None:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+
+            self._analyzer = TfidfVectorizer().build_analyzer()
+        data, indices, indptr = [], [], [0]
+        for message in messages:
+            counts = {}
+            for term in self._analyzer(message):
+                index = self.index(term)
+                if index >= 0:
+                    counts[index] = counts.get(index, 0) + 1
+            for index in sorted(counts):
+                indices.append(index)
+                data.append(counts[index])
+            indptr.append(len(indices))
+        X = csr_matrix((np.array(data, dtype=np.float64), np.array(indices, dtype=np.int32),
+                        np.array(indptr, dtype=np.int64)), shape=(len(messages), len(self.idf)))
+        X.data *= self.idf[X.indices]
+        return normalize(X, copy=False)
+
+
+class HashedTfidfVectorizer:
+    # TF-IDF over a fixed number of hashed term columns. Terms are tokenized like TfidfVectorizer's
+    # and hashed to a column, so there is no vocabulary to build or store, only one IDF weight per
+    # column, and the footprint does not grow with the corpus
+    def __init__(self, idf):
+        self.idf = idf
+        self._hasher = None
+
+    def counts(self, messages):
+        if self._hasher is None:
+            self._hasher = hashing_vectorizer(len(self.idf))
+        return self._hasher.transform(messages)
+
+    def transform(self, messages):
+        from sklearn.preprocessing import normalize
+
+        X = self.counts(messages)
+        X.data *= self.idf[X.indices]
+        X.eliminate_zeros()
+        return normalize(X, copy=False)
+
+
+def hashing_vectorizer(n_features):
+    # Raw term counts, hashed; signs are not alternated, so every count stays positive for the IDF weights
+    from sklearn.feature_extraction.text import HashingVectorizer
+
+    return HashingVectorizer(n_features=n_features, alternate_sign=False, norm=None)
+
+
+def predict_with_scores(model, X):
+    # Predicted intent IDs along with the model's score for each of them
+    if hasattr(model, 'predict_with_scores'):
+        return model.predict_with_scores(X)
+    proba = model.predict_proba(X)
+    best = np.argmax(proba, axis=1)
+    return model.classes_[best], proba[np.arange(len(best)), best]
+
+
+def fit_one_vs_rest(X, labels, intent):
+    # Weights and intercept of a linear SVM separating one intent from all the others
+    from sklearn.svm import LinearSVC
+
+    target = labels == intent
+    if target.all() or not target.any():
+        # Nothing to separate: an intent left without examples must never win
+        return np.zeros(X.shape[1]), 1.0 if target.any() else -np.inf
+    estimator = LinearSVC(random_state=42).fit(X, target)
+    return estimator.coef_[0], estimator.intercept_[0]
+
+
+def expand_ranges(starts, lengths):
+    # Concatenation of range(start, start + length) for every pair, without a Python loop
+    return np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+
+
+class LinearIntentModel:
+    # One weight column per class, so both training and scoring grow linearly with the number of intents.
+    # Weights are indexed by term: weight_rows[f] is the row of the dense weights block holding feature f,
+    # or -1 when f has no nonzero weight and never needs to be read. With a vocabulary nearly every term has
+    # weights and every feature keeps its row, so scoring is a single X @ weights product. A hashed feature
+    # space only keeps the rows of the features in use, and scoring first remaps a message's terms to them
+    ARRAYS = ('weight_rows', 'weights', 'intercept', 'classes')
+
+    def __init__(self, weight_rows, weights, intercept, classes):
+        self.weight_rows = weight_rows
+        self.weights = weights
+        self.intercept = intercept
+        self.classes_ = classes
+
+    @classmethod
+    def fit(cls, X, labels, n_jobs=1):
+        # Fit the one-vs-rest problems independently, n_jobs at a time. liblinear shuffles with a
+        # process-wide random generator, so the problems run in worker processes rather than threads
+        # and the weights come out the same for any n_jobs
+        from joblib import Parallel, delayed
+
+        # Features that never occur in X cannot get a weight; leaving them out keeps every fit small
+        # when the feature space is much wider than the vocabulary in use, as with hashed features
+        X = X.tocsr()
+        features = np.unique(X.indices)
+        X_active = X[:, features]
+        classes = np.unique(labels)
+        columns = Parallel(n_jobs=n_jobs)(delayed(fit_one_vs_rest)(X_active, labels, intent) for intent in classes)
+        coef = np.vstack([weights for weights, _ in columns])
+        intercept = np.array([bias for _, bias in columns])
+        return cls.from_coef(coef, intercept, classes, features, X.shape[1])
+
+    @classmethod
+    def from_estimator(cls, estimator):
+        coef = estimator.coef_
+        intercept = estimator.intercept_
+        if coef.shape[0] == 1:
+            # Binary problems keep a single hyperplane, expand it to one column per class
+            coef = np.vstack([-coef, coef])
+            intercept = np.concatenate([-intercept, intercept])
+        return cls.from_coef(coef, intercept, estimator.classes_)
+
+    @classmethod
+    def from_coef(cls, coef, intercept, classes, features=None, n_features=None):
+        # coef columns belong to the given features (all of them by default) out of n_features.
+        # Rows keep the feature order, so remapped messages keep sorted column indices
+        if features is None:
+            features, n_features = np.arange(coef.shape[1]), coef.shape[1]
+        active = np.flatnonzero(np.any(coef != 0, axis=0))
+        if len(active) >= DENSE_WEIGHTS_ABOVE * n_features:
+            weights = np.zeros((n_features, coef.shape[0]))
+            weights[features] = coef.T
+            return cls(np.arange(n_features, dtype=np.int32), weights, intercept, classes)
+        weight_rows = np.full(n_features, -1, dtype=np.int32)
+        weight_rows[features[active]] = np.arange(len(active))
+        return cls(weight_rows, np.ascontiguousarray(coef[:, active].T), intercept, classes)
+
+    def arrays(self):
+        return {name: getattr(self, 'classes_' if name == 'classes' else name) for name in self.ARRAYS}
+
+    def refit_intents(self, X, labels, intents):
+        # Returns a model where only the columns of the given intents are refitted on the whole corpus.
+        # One-vs-rest columns are independent, so every other intent keeps its weights
+        n_features = X.shape[1]
+        classes = self.classes_.tolist()
+        columns = {}
+        for intent in sorted(intents):
+            columns[intent] = fit_one_vs_rest(X, labels, intent)
+            if intent not in classes:
+                classes.append(intent)
+
+        old_rows = np.full(n_features, -1, dtype=np.int64)
+        old_rows[:len(self.weight_rows)] = self.weight_rows
+        active = old_rows >= 0
+        for weights, _ in columns.values():
+            active |= weights != 0
+        active = np.flatnonzero(active)
+        if len(active) >= DENSE_WEIGHTS_ABOVE * n_features:
+            active = np.arange(n_features)
+
+        block = np.zeros((len(active), len(classes)))
+        has_old = old_rows[active] >= 0
+        block[has_old, :len(self.classes_)] = self.weights[old_rows[active][has_old]]
+        intercept = np.concatenate([self.intercept, np.zeros(len(classes) - len(self.classes_))])
+        column_of = {intent: column for column, intent in enumerate(classes)}
+        for intent, (weights, bias) in columns.items():
+            block[:, column_of[intent]] = weights[active]
+            intercept[column_of[intent]] = bias
+
+        weight_rows = np.full(n_features, -1, dtype=np.int32)
+        weight_rows[active] = np.arange(len(active))
+        return LinearIntentModel(weight_rows, block, intercept, np.array(classes, dtype=self.classes_.dtype))
+
+    def decision_function(self, X):
+        # Terms without weights only ever add exact zeros, dropping them leaves the scores bit for bit
+        # equal to the full X @ coef product
+        from scipy.sparse import csr_matrix
+
+        if len(self.weights) == len(self.weight_rows):
+            # Every feature has its row, in feature order
+            return X @ self.weights + self.intercept
+        X = X.tocsr()
+        rows = self.weight_rows[X.indices]
+        keep = rows >= 0
+        if keep.all():
+            indptr = X.indptr
+        else:
+            row_of_entry = np.repeat(np.arange(X.shape[0]), np.diff(X.indptr))
+            indptr = np.zeros(X.shape[0] + 1, dtype=X.indptr.dtype)
+            np.cumsum(np.bincount(row_of_entry[keep], minlength=X.shape[0]), out=indptr[1:])
+        X = csr_matrix((X.data[keep], rows[keep], indptr), shape=(X.shape[0], len(self.weights)))
+        return X @ self.weights + self.intercept
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.decision_function(X), axis=1)]
+
+    def predict_with_scores(self, X):
+        scores = self.decision_function(X)
+        best = np.argmax(scores, axis=1)
+        return self.classes_[best], scores[np.arange(len(best)), best]
+
+    def predict_with_margin(self, X):
+        # Predicted intent IDs and how far their score is ahead of the runner-up's
+        scores = self.decision_function(X)
+        best = np.argmax(scores, axis=1)
+        rows = np.arange(len(best))
+        top = scores[rows, best]
+        scores[rows, best] = -np.inf
+        return self.classes_[best], top - scores.max(axis=1)
+
+
+class RetrievalIndex:
+    # Cosine similarity search over the training queries. Rows are L2-normalised once at build time
+    # and kept feature-major, so scoring a batch is a single sparse product
+    def __init__(self, matrix, labels):
+        self.matrix = matrix
+        self.labels = labels
+
+    @classmethod
+    def build(cls, X, labels):
+        from sklearn.preprocessing import normalize
+        return cls(normalize(X).T.tocsr(), np.asarray(labels))
+
+    def search(self, X, k=1):
+        # Returns the intent IDs and similarities of the k closest training queries, best first
+        from sklearn.preprocessing import normalize
+        similarities = (normalize(X) @ self.matrix).toarray()
+        k = min(k, similarities.shape[1])
+        if k < similarities.shape[1]:
+            top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        else:
+            top = np.tile(np.arange(k), (similarities.shape[0], 1))
+        top_scores = np.take_along_axis(similarities, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+        top = np.take_along_axis(top, order, axis=1)
+        return self.labels[top], np.take_along_axis(top_scores, order, axis=1)
+
+    def predict(self, X):
+        return self.search(X)[0][:, 0]
+
+    def predict_with_scores(self, X):
+        intents, scores = self.search(X)
+        return intents[:, 0], scores[:, 0]
+
+
+class FlatForest:
+    # A fitted random forest compiled into flat node arrays shared by all trees. Node indices are global
+    # and tree t starts at roots[t]. Leaves hold their normalised class distribution as a sparse slice
+    # leaf_class/leaf_proba[leaf_ptr[node]:leaf_ptr[node + 1]].
+    #
+    # Nodes are numbered so that the path a message with all-zero features would take (its "default
+    # path") is contiguous: the default child of node n is n + 1 and path_end[n] is the leaf that path
+    # reaches. feature_nodes[feature_ptr[f]:feature_ptr[f + 1]] lists the nodes splitting on feature f.
+    # A message only has to stop at nodes testing one of its few nonzero terms, everywhere else it
+    # jumps straight down the default path
+    ARRAYS = ('roots', 'feature', 'threshold', 'left', 'right', 'path_end', 'feature_ptr', 'feature_nodes',
+              'leaf_ptr', 'leaf_class', 'leaf_proba', 'classes')
+
+    def __init__(self, roots, feature, threshold, left, right, path_end, feature_ptr, feature_nodes,
+                 leaf_ptr, leaf_class, leaf_proba, classes):
+        self.roots = roots
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.path_end = path_end
+        self.feature_ptr = feature_ptr
+        self.feature_nodes = feature_nodes
+        self.leaf_ptr = leaf_ptr
+        self.leaf_class = leaf_class
+        self.leaf_proba = leaf_proba
+        self.classes_ = classes
+
+    @classmethod
+    def from_estimator(cls, forest, features=None, n_features=None):
+        # features maps the columns the forest was fitted on to the model's n_features columns,
+        # for a forest trained on a subset of them
+        parts = {name: [] for name in ('feature', 'threshold', 'left', 'right', 'path_end', 'leaf_size',
+                                       'leaf_class', 'leaf_proba')}
+        roots = []
+        offset = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            is_leaf = tree.children_left == -1
+            # A feature value of zero goes left when 0 <= threshold
+            zero_left = tree.threshold >= 0
+            default = np.where(zero_left, tree.children_left, tree.children_right)
+            other = np.where(zero_left, tree.children_right, tree.children_left)
+
+            # Lay out each default path contiguously, depth first
+            order = []
+            stack = [0]
+            while stack:
+                node = stack.pop()
+                while True:
+                    order.append(node)
+                    if is_leaf[node]:
+                        break
+                    stack.append(other[node])
+                    node = default[node]
+            order = np.array(order)
+            position = np.empty(tree.node_count, dtype=np.int64)
+            position[order] = np.arange(tree.node_count) + offset
+
+            leaf = is_leaf[order]
+            path_end = np.empty(tree.node_count, dtype=np.int64)
+            for i in range(tree.node_count - 1, -1, -1):
+                path_end[i] = i + offset if leaf[i] else path_end[i + 1]
+
+            roots.append(offset)
+            parts['feature'].append(np.where(leaf, -1, tree.feature[order]))
+            parts['threshold'].append(tree.threshold[order])
+            parts['left'].append(np.where(leaf, -1, position[tree.children_left[order]]))
+            parts['right'].append(np.where(leaf, -1, position[tree.children_right[order]]))
+            parts['path_end'].append(path_end)
+
+            # Leaf values are class fractions since scikit-learn 1.4 and are used as they are; older
+            # versions store weighted counts, which predict_proba normalises
+            values = tree.value[order, 0, :forest.n_classes_]
+            normalizer = values.sum(axis=1)
+            normalizer[(normalizer == 0.0) | (np.abs(normalizer - 1.0) < 1e-9)] = 1.0
+            proba = np.where(leaf[:, None], values / normalizer[:, None], 0.0)
+            nodes, classes = np.nonzero(proba)
+            parts['leaf_size'].append(np.bincount(nodes, minlength=tree.node_count))
+            parts['leaf_class'].append(classes)
+            parts['leaf_proba'].append(proba[nodes, classes])
+            offset += tree.node_count
+
+        feature = np.concatenate(parts['feature']).astype(np.int32)
+        if features is None:
+            n_features = forest.n_features_in_
+        else:
+            split = feature >= 0
+            feature[split] = features[feature[split]]
+        feature_ptr, feature_nodes = cls.index_features(feature, n_features)
+        leaf_ptr = np.zeros(offset + 1, dtype=np.int64)
+        np.cumsum(np.concatenate(parts['leaf_size']), out=leaf_ptr[1:])
+        return cls(np.array(roots, dtype=np.int64),
+                   feature,
+                   np.concatenate(parts['threshold']).astype(np.float64),
+                   np.concatenate(parts['left']).astype(np.int64),
+                   np.concatenate(parts['right']).astype(np.int64),
+                   np.concatenate(parts['path_end']),
+                   feature_ptr,
+                   feature_nodes,
+                   leaf_ptr,
+                   np.concatenate(parts['leaf_class']).astype(np.int32),
+                   np.concatenate(parts['leaf_proba']).astype(np.float64),
+                   np.asarray(forest.classes_))
+
+    @staticmethod
+    def index_features(feature, n_features):
+        # Inverted index from each feature to the nodes splitting on it
+        split_nodes = np.flatnonzero(feature >= 0)
+        feature_nodes = split_nodes[np.argsort(feature[split_nodes], kind='stable')].astype(np.int64)
+        feature_ptr = np.zeros(n_features + 1, dtype=np.int64)
+        np.cumsum(np.bincount(feature[split_nodes], minlength=n_features), out=feature_ptr[1:])
+        return feature_ptr, feature_nodes
+
+    @classmethod
+    def combine(cls, forests, n_features):
+        # One forest voting with the trees of all the given forests, over a feature space of n_features
+        classes = np.unique(np.concatenate([forest.classes_ for forest in forests]))
+        parts = {name: [] for name in ('roots', 'feature', 'threshold', 'left', 'right', 'path_end', 'leaf_size',
+                                       'leaf_class', 'leaf_proba')}
+        offset = 0
+        for forest in forests:
+            parts['roots'].append(np.asarray(forest.roots) + offset)
+            parts['feature'].append(forest.feature)
+            parts['threshold'].append(forest.threshold)
+            for name in ('left', 'right'):
+                children = np.asarray(getattr(forest, name))
+                parts[name].append(np.where(children >= 0, children + offset, -1))
+            parts['path_end'].append(np.asarray(forest.path_end) + offset)
+            parts['leaf_size'].append(np.diff(forest.leaf_ptr))
+            parts['leaf_class'].append(np.searchsorted(classes, forest.classes_[forest.leaf_class]))
+            parts['leaf_proba'].append(forest.leaf_proba)
+            offset += len(forest.feature)
+
+        feature = np.concatenate(parts['feature']).astype(np.int32)
+        feature_ptr, feature_nodes = cls.index_features(feature, n_features)
+        leaf_ptr = np.zeros(offset + 1, dtype=np.int64)
+        np.cumsum(np.concatenate(parts['leaf_size']), out=leaf_ptr[1:])
+        return cls(np.concatenate(parts['roots']), feature, np.concatenate(parts['threshold']),
+                   np.concatenate(parts['left']), np.concatenate(parts['right']), np.concatenate(parts['path_end']),
+                   feature_ptr, feature_nodes, leaf_ptr, np.concatenate(parts['leaf_class']).astype(np.int32),
+                   np.concatenate(parts['leaf_proba']), classes)
+
+    def arrays(self):
+        return {name: getattr(self, 'classes_' if name == 'classes' else name) for name in self.ARRAYS}
+
+    def predict_proba(self, X):
+        # Trees compare float32 features against float64 thresholds, exactly like scikit-learn
+        X = X.tocsr().astype(np.float32)
+        n_rows = X.shape[0]
+        n_nodes = len(self.feature)
+        n_trees = len(self.roots)
+
+        # Every (row, node) pair where the node splits on one of the row's nonzero features, as sorted
+        # keys row * n_nodes + node, with the feature value the node will compare
+        counts = self.feature_ptr[X.indices + 1] - self.feature_ptr[X.indices]
+        starts = self.feature_ptr[X.indices]
+        entries = expand_ranges(starts, counts)
+        entry_rows = np.repeat(np.repeat(np.arange(n_rows, dtype=np.int64), np.diff(X.indptr)), counts)
+        stop_keys = entry_rows * n_nodes + self.feature_nodes[entries]
+        stop_values = np.repeat(X.data, counts)
+        order = np.argsort(stop_keys, kind='stable')
+        stop_keys, stop_values = stop_keys[order], stop_values[order]
+
+        # Walk every (row, tree) pair at once. Each step jumps down the default path to the next node
+        # testing one of the row's features and takes its real branch, or lands on the path's leaf
+        rows = np.repeat(np.arange(n_rows, dtype=np.int64), n_trees)
+        nodes = np.tile(np.asarray(self.roots), n_rows)
+        leaves = np.empty(n_rows * n_trees, dtype=np.int64)
+        pairs = np.arange(n_rows * n_trees)
+        while len(pairs):
+            base = rows * n_nodes
+            found = np.searchsorted(stop_keys, base + nodes)
+            next_stop = stop_keys[np.minimum(found, len(stop_keys) - 1)] if len(stop_keys) else base - 1
+            ends = self.path_end[nodes]
+            stops = (found < len(stop_keys)) & (next_stop <= base + ends)
+            nodes = ends
+            if stops.any():
+                stop_nodes = next_stop[stops] - base[stops]
+                go_left = stop_values[found[stops]] <= self.threshold[stop_nodes]
+                nodes[stops] = np.where(go_left, self.left[stop_nodes], self.right[stop_nodes])
+            done = self.feature[nodes] < 0
+            leaves[pairs[done]] = nodes[done]
+            keep = ~done
+            pairs, rows, nodes = pairs[keep], rows[keep], nodes[keep]
+
+        # Sum the leaf distributions tree by tree, in the same order scikit-learn adds them up
+        starts = self.leaf_ptr[leaves]
+        lengths = self.leaf_ptr[leaves + 1] - starts
+        entries = expand_ranges(starts, lengths)
+        n_classes = len(self.classes_)
+        bins = np.repeat(np.repeat(np.arange(n_rows, dtype=np.int64), n_trees), lengths)
+        bins = bins * n_classes + self.leaf_class[entries]
+        proba = np.bincount(bins, weights=self.leaf_proba[entries], minlength=n_rows * n_classes)
+        proba = proba.reshape(n_rows, n_classes)
+        proba /= n_trees
+        return proba
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+class ChatResult:
+    # The answer to one message: the chosen intent and its text, the model that chose it ('exact' for
+    # a dataset query) and its confidence, every consulted model's (name, intent ID, score) and the
+    # seconds it took to answer the batch the message came in. Turning it into text is up to render.
+    # confidence is the deciding model's own score: 1.0 for an exact match (with no predictions, as no
+    # model ran), the forest's probability, the cosine similarity for nearest neighbours, and for the
+    # SVM its raw decision value in respond but its margin over the runner-up in respond_cascade
+    __slots__ = ('intent_id', 'answer', 'model', 'confidence', 'predictions', 'seconds')
+
+    # Binary layout: header, one record per prediction, then the UTF-8 answer
+    MODELS = ('exact', 'svm', 'rf', 'knn')
+    HEADER = struct.Struct('<iddBBI')
+    PREDICTION = struct.Struct('<Bid')
+
+    def __init__(self, intent_id, answer, model, confidence, predictions=(), seconds=0.0):
+        self.intent_id = intent_id
+        self.answer = answer
+        self.model = model
+        self.confidence = confidence
+        self.predictions = predictions
+        self.seconds = seconds
+
+    def __eq__(self, other):
+        if not isinstance(other, ChatResult):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return (f'ChatResult(intent_id={self.intent_id!r}, model={self.model!r}, confidence={self.confidence!r}, '
+                f'answer={self.answer!r})')
+
+    def as_dict(self):
+        return {'intent_id': self.intent_id, 'answer': self.answer, 'model': self.model,
+                'confidence': self.confidence, 'predictions': [list(prediction) for prediction in self.predictions],
+                'seconds': self.seconds}
+
+    def to_bytes(self, include_answer=True):
+        # Compact binary form for RPC. A receiver holding the intent table can skip the answer text
+        answer = self.answer.encode('utf-8') if include_answer else b''
+        parts = [self.HEADER.pack(self.intent_id, self.confidence, self.seconds, self.MODELS.index(self.model),
+                                  len(self.predictions), len(answer))]
+        for name, intent_id, score in self.predictions:
+            parts.append(self.PREDICTION.pack(self.MODELS.index(name), intent_id, score))
+        parts.append(answer)
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        intent_id, confidence, seconds, model, n_predictions, answer_size = cls.HEADER.unpack_from(data)
+        offset = cls.HEADER.size
+        predictions = []
+        for _ in range(n_predictions):
+            name, prediction, score = cls.PREDICTION.unpack_from(data, offset)
+            predictions.append((cls.MODELS[name], prediction, score))
+            offset += cls.PREDICTION.size
+        answer = bytes(data[offset:offset + answer_size]).decode('utf-8')
+        return cls(intent_id, answer, cls.MODELS[model], confidence, tuple(predictions), seconds)
+
+
+class ResponseCache:
+    # Bounded least-recently-used cache of formatted replies, entries expire after ttl seconds
+    def __init__(self, max_size=1024, ttl=None, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, expires_at = entry
+        if expires_at is not None and self.clock() >= expires_at:
+            del self.entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        expires_at = None if self.ttl is None else self.clock() + self.ttl
+        self.entries[key] = (value, expires_at)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def stats(self):
+        return {'size': len(self.entries), 'max_size': self.max_size, 'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'expirations': self.expirations}
+
+
+class LatencyHistogram:
+    # Fixed-bucket histogram of durations in seconds, counts[i] holds observations <= bounds[i]
+    # and the last count those above every bound
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def cumulative(self):
+        # (upper bound, observations at or below it) pairs, ending with +Inf
+        total = 0
+        buckets = []
+        for bound, count in zip(self.bounds + (float('inf'),), self.counts):
+            total += count
+            buckets.append((bound, total))
+        return buckets
+
+
+class StageMetrics:
+    # Latency histograms for each stage of respond_batch: normalize (cache and exact-match lookups),
+    # vectorize, predict_<model> and result (building the ChatResults). Every stage is timed once per batch
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.histograms = {}
+
+    def record(self, stage, since):
+        # Observe the time elapsed since the given perf_counter reading and return the current one
+        now = time.perf_counter()
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms[stage] = LatencyHistogram(self.bounds)
+        histogram.observe(now - since)
+        return now
+
+    def snapshot(self):
+        return {stage: {'count': histogram.count, 'sum_seconds': histogram.sum,
+                        'buckets': [[bound, count] for bound, count in histogram.cumulative()]}
+                for stage, histogram in self.histograms.items()}
+
+    def prometheus(self, name='chatbot_stage_seconds'):
+        # Prometheus text exposition format
+        lines = [f'# HELP {name} Time spent in each stage of answering a batch of messages.',
+                 f'# TYPE {name} histogram']
+        for stage, histogram in self.histograms.items():
+            for bound, count in histogram.cumulative():
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{le}"}} {count}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {histogram.sum!r}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+
+def exact_answer_table(queries, labels):
+    # Normalized query -> intent ID, the first example of a query wins
+    table = {}
+    for query, intent_id in zip(queries, labels.tolist()):
+        table.setdefault(normalize_query(query), intent_id)
+    return table
+
+
+def load_array(path, mmap=True):
+    # Empty arrays cannot be memory-mapped
+    array = np.load(path, mmap_mode='r' if mmap else None, allow_pickle=False)
+    return np.asarray(array) if mmap and array.size == 0 else array
+
+
 class BankingChatbot:
-    def __init__(self):
+    def __init__(self, cache_size=None, cache_ttl=None, metrics=None, hash_features=None):
         # Create machine learning models
         self.svm_model = None
         self.rf_model = None
-        self.vectorizer = TfidfVectorizer()
+        self.knn_model = None
+        self.vectorizer = None
+        self.intents = None
+        self.exact_answers = {}
+        self.exact_hits = 0
+        self.exact_misses = 0
+        # Cascade answers settled by the SVM alone, and those that needed the fallback model
+        self.cascade_skips = 0
+        self.cascade_fallbacks = 0
+        # Training queries with their term counts and intents, kept so examples can be added incrementally
+        self.corpus_queries = None
+        self.corpus_counts = None
+        self.corpus_labels = None
+        # Wall-clock seconds per stage of the last train_ml_models call
+        self.train_timings = None
+        # Optional cache of replies for repeated messages, disabled unless cache_size is given
+        self.response_cache = ResponseCache(cache_size, cache_ttl) if cache_size else None
+        # Number of hashed feature columns to train with instead of a vocabulary, None keeps the vocabulary
+        self.hash_features = hash_features
+        # Optional StageMetrics recording how long each stage of answering takes, off when None
+        self.metrics = metrics
+        self.dataset_hash = None
+
+    def train_ml_models(self, dataset, n_jobs=None, chunk_size=DEFAULT_INGEST_CHUNK):
+        # dataset is a JSONL/CSV path or an iterable of (query, response) pairs. It is streamed through
+        # ingest_dataset and counted chunk_size pairs at a time, so only the compact term counts,
+        # the queries and the distinct responses are held in memory.
+        # n_jobs cores are shared between the SVM and the Random Forest, which are fitted concurrently.
+        # Wall-clock seconds of every stage end up in train_timings
+        from concurrent.futures import ThreadPoolExecutor
+
+        from scipy.sparse import csr_matrix, vstack
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.metrics import accuracy_score
+        from sklearn.model_selection import train_test_split
+        from threadpoolctl import threadpool_limits
+
+        n_jobs = n_jobs or os.cpu_count() or 1
+        timings = {}
+        start = time.perf_counter()
 
-    def train_ml_models(self, dataset):
-        # Assuming the dataset is a list of tuples (query, response)
-        queries, responses = zip(*dataset)
+        # Cached replies came from the previous models
+        if self.response_cache is not None:
+            self.response_cache.clear()
 
-        # Vectorize the queries
-        X = self.vectorizer.fit_transform(queries)
+        # Vectorize the queries chunk by chunk. Terms and responses get IDs in the order they are
+        # first seen and are renumbered in sorted order once everything has been read. With
+        # hash_features set, terms are hashed to a fixed set of columns instead
+        analyzer = TfidfVectorizer().build_analyzer()
+        hasher = hashing_vectorizer(self.hash_features) if self.hash_features else None
+        terms, term_ids = [], {}
+        responses, response_ids = [], {}
+        queries, labels, chunks = [], [], []
+        digest_total = 0
+        pairs = ingest_dataset(dataset)
+        while True:
+            chunk = list(islice(pairs, chunk_size))
+            if not chunk:
+                break
+            for query, response in chunk:
+                response_id = response_ids.setdefault(response, len(responses))
+                if response_id == len(responses):
+                    responses.append(response)
+                labels.append(response_id)
+                queries.append(query)
+                digest_total += pair_digest(query, response)
+            if hasher is None:
+                chunks.append(count_terms([query for query, _ in chunk], terms, term_ids, analyzer))
+            else:
+                chunks.append(hasher.transform([query for query, _ in chunk]).astype(np.int64))
+        if not queries:
+            raise ValueError('the training dataset is empty')
+
+        if hasher is None:
+            # Features follow the sorted vocabulary, like TfidfVectorizer's
+            order = np.argsort(np.array(terms, dtype=object), kind='stable')
+            feature_of = np.empty(len(terms), dtype=np.int32)
+            feature_of[order] = np.arange(len(terms), dtype=np.int32)
+            chunks = [csr_matrix((data, feature_of[indices], indptr), shape=(len(indptr) - 1, len(terms)))
+                      for data, indices, indptr in chunks]
+        counts = vstack(chunks, format='csr')
+        counts.sort_indices()
+        del chunks
+
+        # Train on compact integer intent IDs, the response text is only looked up when answering
+        self.intents, intent_of = IntentTable.compile(responses)
+        labels = intent_of[np.array(labels, dtype=np.int64)]
+        idf, X = tfidf_from_counts(counts)
+        if hasher is None:
+            self.vectorizer = MappedTfidfVectorizer(StringTable.pack([terms[index] for index in order]), idf)
+        else:
+            self.vectorizer = HashedTfidfVectorizer(idf)
+        self.corpus_queries = StringTable.pack(queries)
+        self.corpus_counts = counts
+        self.corpus_labels = labels
+        timings['vectorize'] = time.perf_counter() - start
 
         # Split the dataset into training and testing sets
-        X_train, X_test, y_train, y_test = train_test_split(X, responses, test_size=0.2, random_state=42)
+        X_train, X_test, y_train, y_test = train_test_split(X, labels, test_size=0.2, random_state=42)
+        # The forest only sees the columns that occur in the corpus. It makes no difference with a
+        # vocabulary, but keeps mostly empty hashed columns out of the features each split samples from
+        features = np.unique(X.indices)
 
-        # Train Support Vector Machine (SVM) classifier
-        svm_classifier = SVC(kernel='linear')
-        svm_classifier.fit(X_train, y_train)
-        svm_predictions = svm_classifier.predict(X_test)
-        svm_accuracy = accuracy_score(y_test, svm_predictions)
-        self.svm_model = svm_classifier
+        svm_jobs = max(1, n_jobs // 2)
+        rf_jobs = max(1, n_jobs - svm_jobs)
+
+        def fit_svm():
+            # Train a one-vs-rest linear Support Vector Machine (SVM) classifier
+            stage_start = time.perf_counter()
+            model = LinearIntentModel.fit(X_train, y_train, n_jobs=svm_jobs)
+            timings['svm'] = time.perf_counter() - stage_start
+            return model
 
         #__________________________We have two different classifiers to produce _________________________________
 
-        # Train Random Forest classifier
-        rf_classifier = RandomForestClassifier(n_estimators=100, random_state=42)
-        rf_classifier.fit(X_train, y_train)
-        rf_predictions = rf_classifier.predict(X_test)
+        def fit_rf():
+            # Train Random Forest classifier, its trees are grown on rf_jobs threads (seeded up front,
+            # so the forest does not depend on rf_jobs)
+            stage_start = time.perf_counter()
+            rf_classifier = RandomForestClassifier(n_estimators=FOREST_TREES, random_state=42, n_jobs=rf_jobs)
+            rf_classifier.fit(X_train[:, features], y_train)
+            # Answer from the forest compiled into flat node arrays, not the scikit-learn estimator
+            model = FlatForest.from_estimator(rf_classifier, features, X.shape[1])
+            timings['rf'] = time.perf_counter() - stage_start
+            return model
+
+        # The models are independent, so they train side by side. Parallelism comes from the worker
+        # pools above; BLAS and OpenMP are held to one thread each so they don't oversubscribe the cores
+        stage_start = time.perf_counter()
+        with threadpool_limits(limits=1), ThreadPoolExecutor(max_workers=min(2, n_jobs)) as pool:
+            svm_future = pool.submit(fit_svm)
+            rf_future = pool.submit(fit_rf)
+            self.svm_model = svm_future.result()
+            self.rf_model = rf_future.result()
+        timings['fit'] = time.perf_counter() - stage_start
+
+        svm_predictions = self.svm_model.predict(X_test)
+        svm_accuracy = accuracy_score(y_test, svm_predictions)
+        rf_predictions = self.rf_model.predict(X_test)
         rf_accuracy = accuracy_score(y_test, rf_predictions)
-        self.rf_model = rf_classifier
+
+        # Index every query for nearest-neighbour retrieval, most intents only have a single example
+        stage_start = time.perf_counter()
+        self.knn_model = RetrievalIndex.build(X, labels)
+        timings['knn'] = time.perf_counter() - stage_start
+
+        # Questions that match a dataset query after normalization are answered without the models
+        stage_start = time.perf_counter()
+        self.exact_answers = exact_answer_table(queries, labels)
+        self.dataset_hash = f'{digest_total % 2 ** 256:064x}'
+        timings['exact'] = time.perf_counter() - stage_start
+        timings['total'] = time.perf_counter() - start
+        self.train_timings = timings
+
+    def vocabulary(self):
+        # The fitted terms in feature order and their IDF weights, in vocabulary mode
+        return self.vectorizer.terms, self.vectorizer.idf
+
+    def add_examples(self, examples, extra_trees=DEFAULT_EXTRA_TREES):
+        # Add (query, response) pairs without retraining everything: the vocabulary is extended,
+        # only the SVM columns of the intents involved are refitted, the forest grows extra_trees
+        # trees over the updated corpus and the retrieval index and exact matches are rebuilt.
+        # Call train_ml_models periodically for a full rebuild
+        self._apply_examples(list(examples), replace=False, extra_trees=extra_trees)
+
+    def update_examples(self, examples, extra_trees=DEFAULT_EXTRA_TREES):
+        # Like add_examples, but a query already in the corpus (after normalization) gets its response replaced
+        self._apply_examples(list(examples), replace=True, extra_trees=extra_trees)
+
+    def _apply_examples(self, examples, replace, extra_trees):
+        from scipy.sparse import csr_matrix, vstack
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        queries = list(self.corpus_queries)
+        labels = np.array(self.corpus_labels, dtype=np.int32)
+        responses = list(self.intents)
+        intent_ids = {response: intent_id for intent_id, response in enumerate(responses)}
+        rows_of_key = {}
+        if replace:
+            for row, query in enumerate(queries):
+                rows_of_key.setdefault(normalize_query(query), []).append(row)
+        # Pairs are cleaned and deduplicated like ingest_dataset does, so adding a pair the corpus
+        # already holds changes neither the models nor the dataset hash
+        seen = {pair_digest(normalize_query(query), responses[label]) for query, label in zip(queries, labels)}
+
+        affected = set()
+        added, removed = [], []
+        new_queries, new_labels = [], []
+        for query, response in examples:
+            query, response = ' '.join(query.split()), ' '.join(response.split())
+            if not query or not response:
+                continue
+            key = pair_digest(normalize_query(query), response)
+            if key in seen:
+                continue
+            seen.add(key)
+            intent_id = intent_ids.setdefault(response, len(responses))
+            if intent_id == len(responses):
+                responses.append(response)
+            affected.add(intent_id)
+            rows = rows_of_key.get(normalize_query(query))
+            if rows:
+                for row in rows:
+                    affected.add(int(labels[row]))
+                    removed.append((queries[row], responses[labels[row]]))
+                    added.append((queries[row], response))
+                    labels[row] = intent_id
+            else:
+                new_queries.append(query)
+                new_labels.append(intent_id)
+                added.append((query, response))
+        if not affected:
+            return
+
+        old_counts = self.corpus_counts
+        if isinstance(self.vectorizer, HashedTfidfVectorizer):
+            # Hashed columns are fixed, new terms simply land in theirs
+            n_features = old_counts.shape[1]
+            if new_queries:
+                new_counts = self.vectorizer.counts(new_queries).astype(old_counts.dtype)
+            else:
+                # HashingVectorizer cannot transform an empty list
+                new_counts = csr_matrix((0, n_features), dtype=old_counts.dtype)
+        else:
+            # Count the new queries' terms, appending unseen terms to the end of the vocabulary
+            terms, _ = self.vocabulary()
+            terms = list(terms)
+            term_ids = {term: index for index, term in enumerate(terms)}
+            data, indices, indptr = count_terms(new_queries, terms, term_ids, TfidfVectorizer().build_analyzer())
+            n_features = len(terms)
+            new_counts = csr_matrix((data.astype(old_counts.dtype), indices, indptr),
+                                    shape=(len(new_queries), n_features))
+        old_counts = csr_matrix((old_counts.data, old_counts.indices, old_counts.indptr),
+                                shape=(old_counts.shape[0], n_features))
+        counts = vstack([old_counts, new_counts], format='csr')
+        labels = np.concatenate([labels, np.array(new_labels, dtype=np.int32)])
+        queries.extend(new_queries)
+        idf, X = tfidf_from_counts(counts)
+
+        if isinstance(self.vectorizer, HashedTfidfVectorizer):
+            self.vectorizer = HashedTfidfVectorizer(idf)
+        else:
+            order = self.vectorizer.order if n_features == len(self.vectorizer.idf) else sorted_order(terms)
+            self.vectorizer = MappedTfidfVectorizer(StringTable.pack(terms), idf, order)
+        self.intents = IntentTable.pack(responses)
+        self.svm_model = self.svm_model.refit_intents(X, labels, affected)
+        features = np.unique(X.indices)
+        if removed:
+            # Relabeled rows still vote for their old answers in every existing tree, and a few extra
+            # trees cannot outvote them, so the forest is refitted on the updated corpus
+            forest = RandomForestClassifier(n_estimators=FOREST_TREES, random_state=42, n_jobs=-1)
+            forest.fit(X[:, features], labels)
+            self.rf_model = FlatForest.from_estimator(forest, features, n_features)
+        elif extra_trees:
+            extra = RandomForestClassifier(n_estimators=extra_trees, random_state=len(queries))
+            extra.fit(X[:, features], labels)
+            extra = FlatForest.from_estimator(extra, features, n_features)
+            self.rf_model = FlatForest.combine([self.rf_model, extra], n_features)
+        else:
+            # Same trees, indexed over the extended vocabulary
+            self.rf_model = FlatForest.combine([self.rf_model], n_features)
+        self.knn_model = RetrievalIndex.build(X, labels)
+        self.exact_answers = exact_answer_table(queries, labels)
+        self.corpus_queries = StringTable.pack(queries)
+        self.corpus_counts = counts
+        self.corpus_labels = labels
+        self.dataset_hash = update_dataset_hash(self.dataset_hash, added, removed)
+        if self.response_cache is not None:
+            self.response_cache.clear()
+
+    def model_arrays(self):
+        # Everything needed to answer messages and to add examples later, as a flat dict of numpy arrays
+        if isinstance(self.exact_answers, MappedLookup):
+            exact_keys, exact_intents = self.exact_answers.keys, self.exact_answers.values
+        else:
+            # Sorted, so a loaded bundle can search the keys in place
+            exact = sorted(self.exact_answers.items())
+            exact_keys = StringTable.pack([key for key, _ in exact])
+            exact_intents = np.array([intent_id for _, intent_id in exact], dtype=np.int32)
+        arrays = {
+            'intent_blob': self.intents.blob,
+            'intent_offsets': self.intents.offsets,
+            'knn_data': self.knn_model.matrix.data,
+            'knn_indices': self.knn_model.matrix.indices,
+            'knn_indptr': self.knn_model.matrix.indptr,
+            'knn_labels': self.knn_model.labels,
+            'exact_blob': exact_keys.blob,
+            'exact_offsets': exact_keys.offsets,
+            'exact_intents': exact_intents,
+            'corpus_query_blob': self.corpus_queries.blob,
+            'corpus_query_offsets': self.corpus_queries.offsets,
+            'corpus_counts_data': self.corpus_counts.data,
+            'corpus_counts_indices': self.corpus_counts.indices,
+            'corpus_counts_indptr': self.corpus_counts.indptr,
+            'corpus_labels': self.corpus_labels,
+        }
+        # A hashed vectorizer only has its IDF weights, the bundle tells the two apart by name
+        if isinstance(self.vectorizer, HashedTfidfVectorizer):
+            arrays['hashed_idf'] = self.vectorizer.idf
+        else:
+            terms, arrays['idf'] = self.vocabulary()
+            arrays['vocabulary_blob'] = terms.blob
+            arrays['vocabulary_offsets'] = terms.offsets
+            # Only vocabularies extended by add_examples are out of order
+            if self.vectorizer.order is not None:
+                arrays['vocabulary_order'] = self.vectorizer.order
+        for name, array in self.svm_model.arrays().items():
+            arrays[f'svm_{name}'] = array
+        for name, array in self.rf_model.arrays().items():
+            arrays[f'rf_{name}'] = array
+        return arrays
+
+    def bind_model_arrays(self, arrays):
+        # Rebuild the models on top of the given arrays without copying them
+        from scipy.sparse import csr_matrix
+
+        self.intents = IntentTable(arrays['intent_blob'], arrays['intent_offsets'])
+        if 'hashed_idf' in arrays:
+            self.vectorizer = HashedTfidfVectorizer(arrays['hashed_idf'])
+        else:
+            self.vectorizer = MappedTfidfVectorizer(StringTable(arrays['vocabulary_blob'], arrays['vocabulary_offsets']),
+                                                    arrays['idf'], arrays.get('vocabulary_order'))
+        self.svm_model = LinearIntentModel(*(arrays[f'svm_{name}'] for name in LinearIntentModel.ARRAYS))
+        self.rf_model = FlatForest(*(arrays[f'rf_{name}'] for name in FlatForest.ARRAYS))
+        knn_matrix = csr_matrix((arrays['knn_data'], arrays['knn_indices'], arrays['knn_indptr']),
+                                shape=(len(arrays['knn_indptr']) - 1, len(arrays['knn_labels'])), copy=False)
+        self.knn_model = RetrievalIndex(knn_matrix, arrays['knn_labels'])
+        self.exact_answers = MappedLookup(StringTable(arrays['exact_blob'], arrays['exact_offsets']),
+                                          arrays['exact_intents'])
+        self.corpus_queries = StringTable(arrays['corpus_query_blob'], arrays['corpus_query_offsets'])
+        self.corpus_labels = arrays['corpus_labels']
+        self.corpus_counts = csr_matrix((arrays['corpus_counts_data'], arrays['corpus_counts_indices'],
+                                         arrays['corpus_counts_indptr']),
+                                        shape=(len(arrays['corpus_labels']), len(self.vectorizer.idf)), copy=False)
+        if self.response_cache is not None:
+            self.response_cache.clear()
+
+    def save_model(self, path=MODEL_BUNDLE_PATH):
+        arrays = self.model_arrays()
+        # Write into a temporary directory first so a crash never leaves a half-written bundle behind
+        tmp_path = f'{path}.tmp-{os.getpid()}'
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_path, f'{name}.npy'), np.ascontiguousarray(array), allow_pickle=False)
+        manifest = {'version': MODEL_BUNDLE_VERSION, 'dataset_hash': self.dataset_hash, 'arrays': sorted(arrays)}
+        with open(os.path.join(tmp_path, 'manifest.json'), 'w') as manifest_file:
+            json.dump(manifest, manifest_file, indent=2)
+
+        old_path = f'{path}.old-{os.getpid()}'
+        if os.path.exists(path):
+            os.replace(path, old_path)
+        os.replace(tmp_path, path)
+        shutil.rmtree(old_path, ignore_errors=True)
+
+    def load_model(self, path=MODEL_BUNDLE_PATH, expected_hash=None, mmap=True):
+        # Returns False when the bundle is missing, from another version or trained on other data.
+        # Arrays are memory-mapped, so loading costs the same whatever the model size and pages
+        # are only read from disk when a prediction touches them
+        try:
+            with open(os.path.join(path, 'manifest.json')) as manifest_file:
+                manifest = json.load(manifest_file)
+        except (OSError, ValueError):
+            return False
+        if manifest.get('version') != MODEL_BUNDLE_VERSION:
+            return False
+        if expected_hash is not None and manifest.get('dataset_hash') != expected_hash:
+            return False
+        try:
+            arrays = {name: load_array(os.path.join(path, f'{name}.npy'), mmap) for name in manifest['arrays']}
+            self.bind_model_arrays(arrays)
+        except (OSError, ValueError, KeyError):
+            return False
+        self.dataset_hash = manifest['dataset_hash']
+        return True
+
+    def load_or_train(self, dataset, path=MODEL_BUNDLE_PATH):
+        # Reuse the saved bundle if it matches the dataset, otherwise retrain and save it.
+        # A JSONL/CSV path is read twice, once to hash it and once to train; any other iterable of
+        # pairs may be one-shot, so it is ingested into a list first
+        if not isinstance(dataset, (str, os.PathLike)):
+            dataset = list(ingest_dataset(dataset))
+        if self.load_model(path, expected_hash=dataset_hash(ingest_dataset(dataset))):
+            # The bundle must also use the feature space this bot was asked for
+            hashed = isinstance(self.vectorizer, HashedTfidfVectorizer)
+            if (len(self.vectorizer.idf) if hashed else None) == self.hash_features:
+                return False
+        self.train_ml_models(dataset)
+        self.save_model(path)
+        return True
+
+    def vectorize(self, messages):
+        # Tokenize and TF-IDF weight the messages once, for every model to share
+        return self.vectorizer.transform(messages)
+
+    def predict_vector(self, X, models=DEFAULT_MODELS, return_scores=False):
+        # Run the requested models on already vectorized messages, returning predicted intent IDs
+        # (and each model's score for them when return_scores is set)
+        metrics = self.metrics
+        predictions = {}
+        for name in models:
+            if metrics is not None:
+                start = time.perf_counter()
+            model = getattr(self, f'{name}_model')
+            predictions[name] = predict_with_scores(model, X) if return_scores else model.predict(X)
+            if metrics is not None:
+                metrics.record(f'predict_{name}', start)
+        return predictions
 
     def predict_svm_response(self, query):
-        query_vectorized = self.vectorizer.transform([query])
-        return self.svm_model.predict(query_vectorized)[0]
+        return self.intents[self.predict_vector(self.vectorize([query]), models=('svm',))['svm'][0]]
 
     def predict_rf_response(self, query):
-        query_vectorized = self.vectorizer.transform([query])
-        return self.rf_model.predict(query_vectorized)[0]
-
-    def respond(self, message):
-        # Use both SVM and Random Forest models to predict the response
-        svm_response = self.predict_svm_response(message)
-        rf_response = self.predict_rf_response(message)
-        return f'Responding - SVM: {svm_response}, Random Forest: {rf_response}'
-
-
-
-
-####
-# Generate a synthetic imbalanced dataset for illustration
-X, y = make_classification(n_classes=2, class_sep=2, weights=[0.1, 0.9],
-                           n_informative=3, n_redundant=1, flip_y=0,
-                           n_features=20, n_clusters_per_class=1,
-                           n_samples=1000, random_state=42)
-
-# Split the dataset into training and testing sets
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-# Apply oversampling to the training set
-oversampler = RandomOverSampler(sampling_strategy='minority', random_state=42)
-X_train_resampled, y_train_resampled = oversampler.fit_resample(X_train, y_train)
-
-# Apply undersampling to the training set
-undersampler = RandomUnderSampler(sampling_strategy='majority', random_state=42)
-X_train_resampled, y_train_resampled = undersampler.fit_resample(X_train, y_train)
-
-
-# Example usage with a dataset of queries and responses
-banking_chatbot = BankingChatbot()
-
-# Define a dataset for machine learning
-dataset = [
-    ("Can I redeem my credit card rewards?",
-     "Absolutely! You can redeem your credit card rewards through your online account or by contacting our rewards center."),
-    ("What is the annual fee for my credit card?",
-     "The annual fee for your credit card is $X.XX. Let me know if you have any questions regarding the fee structure."),
-    ("How do I apply for a credit limit increase?",
-     "You can apply for a credit limit increase by filling out the online form available in your account settings."),
-    ("Tell me about the security features of my credit card.",
-     "Your credit card comes with advanced security features, including fraud monitoring and zero-liability protection. Rest assured, your transactions are secure."),
-    ("Can I add an authorized user to my credit card?",
-     "Certainly! To add an authorized user, log in to your account and navigate to the 'Manage Authorized Users' section."),
-    #debit card
-    ("How can I activate my debit card?",
-     "You can activate your debit card by calling the activation number provided with the card or by using our online banking services. Follow the instructions to complete the activation."),
-    ("What is the daily withdrawal limit on my debit card?",
-     "The daily withdrawal limit on your debit card is $X,XXX. Keep in mind that this limit may vary based on your account type and any additional settings you've configured."),
-    ("Tell me about the benefits of my debit card.",
-     "Your debit card comes with benefits such as convenient access to your funds, secure transactions, and the ability to make purchases online and in-store. Check our website for detailed information."),
-    ("Can I set up transaction alerts for my debit card?",
-     "Yes, you can set up transaction alerts for your debit card through our online banking platform. Log in to your account and navigate to the 'Alerts' or 'Notifications' section."),
-    ("What should I do if my debit card is lost or stolen?",
-     "If your debit card is lost or stolen, report it immediately by contacting our 24/7 customer service hotline. We'll assist you in securing your account and issuing a replacement card."),
-    ("How can I change the PIN on my debit card?",
-     "You can change the PIN on your debit card by visiting one of our ATMs or using our online banking services. Navigate to the 'Card Services' or 'Manage PIN' section for instructions."),
-    ("Tell me about the foreign transaction fees on my debit card.",
-     "There is a foreign transaction fee of X% on purchases made with your debit card in a currency other than U.S. dollars. Review our fee schedule for additional details."),
-    ("Can I request a replacement for my damaged debit card?",
-     "Certainly! If your debit card is damaged, contact our customer service, and we'll assist you in getting a new card. A replacement card will be sent to your registered address."),
-    ("What is the daily spending limit on my debit card?",
-     "The daily spending limit on your debit card is $X,XXX. This limit applies to both point-of-sale transactions and online purchases."),
-    ("Tell me about the overdraft protection options for my debit card.",
-     "We offer overdraft protection options to help you avoid declined transactions. You can link your debit card to a savings account or apply for overdraft protection services."),
-    ("How can I dispute a transaction on my debit card?",
-     "If you need to dispute a transaction, contact our customer service with details about the charge. We'll guide you through the dispute resolution process."),
-    ("Can I customize the daily spending limit on my debit card?",
-     "Yes, you can customize the daily spending limit on your debit card through our online banking services. Visit the 'Card Settings' or 'Spending Limits' section for adjustments."),
-    ("Tell me about the benefits of the extended warranty on my debit card.",
-     "The extended warranty on your debit card provides additional coverage on qualifying purchases. Check our terms and conditions for specific details."),
-    ("How do I set up direct deposit for my debit card?",
-     "To set up direct deposit for your debit card, provide your employer with our routing and account numbers. This can typically be done through your employer's HR or payroll department."),
-    ("What steps should I take if I forget my debit card PIN?",
-     "If you forget your debit card PIN, you can reset it by visiting one of our ATMs or using our online banking services. Choose the 'Forgot PIN' or 'Reset PIN' option."),
-    ("Can I request a contactless debit card?",
-     "Yes, you can request a contactless debit card through our customer service or by visiting a branch. Contactless cards offer a convenient and secure way to make transactions."),
-    ("Tell me about the benefits of the rewards program linked to my debit card.",
-     "The rewards program linked to your debit card offers benefits such as cashback, discounts, or loyalty points. Explore our rewards program details for information on available perks."),
-    ("How can I track my debit card transactions?",
-     "You can track your debit card transactions by logging in to our online banking platform and navigating to the 'Transactions' or 'Account Activity' section. A detailed history will be available."),
-    ("What is the process for replacing an expired debit card?",
-     "An expired debit card will automatically be replaced, and a new card will be sent to your registered address. You can also request a replacement through our customer service."),
-    ("Are there any fees for using ATMs with my debit card?",
-     "Fees for using ATMs with your debit card may apply, depending on the ATM's network and location. Review our fee schedule or use our ATM locator tool for fee-free options."),
-    ("Can I request a debit card with a custom design?",
-     "Yes, you can request a debit card with a custom design through our customer service or online banking services. Choose from our available design options or upload your own image."),
-    ("Tell me about the benefits of the purchase protection on my debit card.",
-     "The purchase protection on your debit card offers coverage against damage or theft for qualifying purchases. Review our terms and conditions for detailed information."),
-    ("How can I set up e-statements for my debit card?",
-     "To set up e-statements for your debit card, log in to our online banking platform and navigate to the 'Statements' or 'Account Preferences' section. Choose the electronic statement option."),
-    ("What is the process for upgrading my debit card?",
-     "To upgrade your debit card, contact our customer service or visit a branch to explore available options. Upgraded cards may offer additional features or benefits."),
-    ("Tell me about the benefits of the travel insurance on my debit card.",
-     "The travel insurance on your debit card provides coverage for [specific benefits]. Check our website for comprehensive details on the travel insurance policy."),
-    ("How can I set a travel notification for my debit card?",
-     "Set a travel notification for your debit card through our online banking platform. Visit the 'Travel' or 'Card Settings' section and provide your travel details to avoid any issues during your trip."),
-    ("Can I request a debit card statement for the last six months?",
-     "Certainly! You can request a debit card statement for the last six months by logging in to our online banking platform or contacting our customer service."),
-    ("Tell me about the rewards redemption options for my debit card.",
-     "You can redeem rewards from your debit card for cashback, gift cards, or other options. Explore the rewards catalog on our website for a list of available redemption choices."),
-    ("What is the process for reporting unauthorized transactions on my debit card?",
-     "If you notice unauthorized transactions on your debit card, contact our customer service immediately. We'll guide you through the process of reporting and resolving the issue."),
-    ("Are there any restrictions on using my debit card abroad?",
-     "Your debit card can be used internationally, but it's advisable to inform us before traveling to prevent any disruptions in card usage."),
-    ("Can I request a debit card with a lower daily spending limit?",
-     "Yes, you can request a debit card with a lower daily spending limit through our customer service or online banking services. Adjustments are subject to approval."),
-    ("Tell me about the benefits of the cashback rewards program on my debit card.",
-     "The cashback rewards program on your debit card allows you to earn cashback on qualifying purchases. Check our rewards program details for information on earning and redeeming cashback."),
-    ("How do I update my contact information linked to my debit card?",
-     "To update your contact information, log in to our online banking platform and navigate to the 'Profile' or 'Account Settings' section. Ensure your details are up to date for communication purposes."),
-    ("What steps should I take if my debit card gets declined?",
-     "If your debit card gets declined, verify your account balance and check for any transaction limits. If issues persist, contact our customer service for assistance."),
-    ("Can I request an additional debit card for a family member?",
-     "Yes, you can request an additional debit card for a family member through our customer service or online banking services. Follow the process for requesting an extra card."),
-    ("Tell me about the benefits of the zero-liability protection on my debit card.",
-     "The zero-liability protection on your debit card ensures you won't be held responsible for unauthorized transactions. Review our terms and conditions for details on this protection."),
-    ("How can I apply for a new debit card?",
-     "To apply for a new debit card, visit our website and follow the online application process. You'll receive the new card at your registered address upon approval."),
-    ("What is the process for disputing an ATM transaction made with my debit card?",
-     "If you need to dispute an ATM transaction, contact our customer service with details about the transaction. We'll initiate an investigation and guide you through the resolution process."),
-    ("Tell me about the benefits of the overdraft protection service for my debit card.",
-     "The overdraft protection service for your debit card helps prevent declined transactions by covering insufficient funds. Explore our terms and conditions for details on this service."),
-    ("How can I set up account alerts for my debit card?",
-     "Set up account alerts for your debit card through our online banking platform. Visit the 'Alerts' or 'Notifications' section and choose the alerts you wish to receive."),
-    ("Can I request a replacement for my expired debit card?",
-     "Certainly! If your debit card is expired, contact our customer service, and we'll guide you through the replacement process. A new card will be sent to your registered address."),
-    ("What is the process for upgrading my debit card for contactless payments?",
-     "To upgrade your debit card for contactless payments, contact our customer service or visit a branch to explore available options. Upgraded cards offer a convenient tap-and-go feature."),
-    ("Tell me about the benefits of the contactless payment feature on my debit card.",
-     "The contactless payment feature on your debit card provides a convenient and secure way to make quick transactions. Simply tap your card on the contactless reader to complete the payment."),
-    ("How can I check the balance on my debit card?",
-     "Check the balance on your debit card by logging in to our online banking platform or by using our automated phone service. Both options provide up-to-date information on your account."),
-    ("What is the process for reporting a suspicious email or phishing attempt related to my debit card?",
-     "If you receive a suspicious email or phishing attempt related to your debit card, forward it to our customer service or report it through our online banking platform. We'll investigate and take appropriate actions."),
-    ("Tell me about the benefits of the rewards program linked to my debit card.",
-     "The rewards program linked to your debit card offers various benefits, including discounts, cashback, or loyalty points. Explore our rewards program details for information on available perks."),
-    ("How can I set up automatic payments for my utility bills using my debit card?",
-     "To set up automatic payments for your utility bills, contact your utility providers and provide them with your debit card details. They will guide you through the process of enrollment."),
-    ("What steps should I take if my debit card is damaged?",
-     "If your debit card is damaged, contact our customer service, and we'll assist you in getting a replacement card. A new card will be sent to your registered address."),
-    ("Can I dispute a recurring charge on my debit card?",
-     "Yes, you can dispute a recurring charge on your debit card by contacting our customer service. Provide details about the charge, and we'll guide you through the dispute resolution process."),
-    ("Tell me about the benefits of the purchase protection on my debit card.",
-     "The purchase protection on your debit card offers coverage against damage or theft for qualifying purchases. Review our terms and conditions for specific details."),
-    ("How can I set a spending limit for my debit card?",
-     "You can set a spending limit for your debit card through our online banking platform. Visit the 'Card Settings' or 'Spending Controls' section and choose the desired limit."),
-    ("What is the process for replacing a stolen debit card?",
-     "If your debit card is stolen, report it immediately by contacting our 24/7 customer service hotline. We'll assist you in securing your account and issuing a replacement card."),
-    ("Tell me about the benefits of the travel insurance on my debit card.",
-     "The travel insurance on your debit card provides coverage for [specific benefits]. Check our website for comprehensive details on the travel insurance policy."),
-    ("How can I set a travel notification for my debit card?",
-     "Set a travel notification for your debit card through our online banking platform. Visit the 'Travel' or 'Card Settings' section and provide your travel details to avoid any issues during your trip."),
-    ("Can I request a debit card statement for the last six months?",
-     "Certainly! You can request a debit card statement for the last six months by logging in to our online banking platform or contacting our customer service."),
-
-    # Credit Card Queries
-    ("Can I redeem my credit card rewards?",
-     "Absolutely! You can redeem your credit card rewards through your online account or by contacting our rewards center."),
-    ("What is the annual fee for my credit card?",
-     "The annual fee for your credit card is $X.XX. Let me know if you have any questions regarding the fee structure."),
-    ("How do I apply for a credit limit increase?",
-     "You can apply for a credit limit increase by filling out the online form available in your account settings."),
-    ("Tell me about the security features of my credit card.",
-     "Your credit card comes with advanced security features, including fraud monitoring and zero-liability protection. Rest assured, your transactions are secure."),
-    ("What benefits come with my credit card?",
-     "Your credit card offers benefits such as travel insurance, purchase protection, and extended warranty. Check our website for a detailed list of benefits."),
-    ("How do I report a lost or stolen credit card?",
-     "If your card is lost or stolen, please report it immediately by contacting our 24/7 customer service hotline."),
-    ("What is the minimum payment due on my credit card?",
-     "The minimum payment due on your card for this month is $X.XX. Make sure to pay at least this amount to avoid late fees."),
-    ("Tell me about the cashback rewards on my credit card.",
-     "Your credit card offers cashback rewards on eligible purchases. Check your rewards summary for details on how to redeem them."),
-    ("Is there a foreign transaction fee on my credit card?",
-     "Yes, there is a foreign transaction fee of X% on purchases made in a currency other than U.S. dollars."),
-    ("How can I update my contact information on my credit card account?",
-     "To update your contact information, log in to your account and go to the 'Profile' or 'Account Settings' section."),
-    ("Can I transfer my credit card balance to another card?",
-     "Yes, you can transfer your credit card balance to another card. Check your account for balance transfer options and terms."),
-    ("Tell me about the rewards redemption options.",
-     "You can redeem your rewards for cash back, travel, gift cards, and more. Explore the rewards catalog on our website for available options."),
-    ("How can I set up account alerts for my credit card?",
-     "To set up account alerts, log in to your account and navigate to the 'Alerts' or 'Notifications' section. Choose the alerts you'd like to receive."),
-    ("What is the credit limit on my card?",
-     "Your current credit limit is $X,XXX. If you're interested in an increase, you can apply through your online account."),
-    ("Are there any restrictions on using my credit card abroad?",
-     "Your credit card can be used internationally, but please notify us before traveling to prevent any potential issues with foreign transactions."),
-    ("Can I customize the due date for my credit card payments?",
-     "Yes, you can customize your credit card's due date through your online account settings. Choose a date that works best for you."),
-    ("Tell me about the balance transfer fees.",
-     "The balance transfer fee is X% of the transferred amount, with a minimum fee of $X.XX. Review the terms on our website for more details."),
-    ("How can I check my credit card statement online?",
-     "You can view your credit card statement by logging in to your account and navigating to the 'Statements' or 'Account Activity' section."),
-    ("What is the maximum cash advance limit on my credit card?",
-     "The maximum cash advance limit on your credit card is $X.XX. Keep in mind that cash advances may have additional fees and interest rates."),
-    ("Tell me about the rewards expiration policy.",
-     "Your credit card rewards expire after [expiration period]. Be sure to check your rewards summary and redeem them before the expiration date."),
-    ("Can I request a replacement for my damaged credit card?",
-     "Certainly! To request a replacement for your damaged credit card, contact our customer service, and we'll assist you in getting a new card."),
-    ("How can I dispute a charge on my credit card?",
-     "If you need to dispute a charge, you can initiate the process through your online account or by contacting our customer service. Provide details about the transaction."),
-    ("Tell me about the benefits of upgrading my credit card.",
-     "Upgrading your credit card may offer additional benefits such as higher rewards, travel perks, and exclusive offers. Check your eligibility and options online."),
-    ("What credit bureau do you use for credit card applications?",
-     "We typically use [Credit Bureau] for credit card applications. Your credit report from this bureau will be considered during the application process."),
-    ("Can I set up a recurring payment for my credit card bills?",
-     "Certainly! You can set up a recurring payment for your credit card bills through the 'AutoPay' option in your online account settings."),
-    ("Tell me about the reward points earning structure.",
-     "You earn [X] points for every [currency] spent on eligible purchases. Check the rewards program details for bonus categories and points redemption options."),
-    ("How can I track my credit card spending?",
-     "You can track your credit card spending by reviewing your online account statements, transaction history, and utilizing budgeting tools available on our website."),
-    ("What steps should I take if I suspect fraudulent activity on my credit card?",
-     "If you suspect fraudulent activity, contact our fraud department immediately. We'll guide you through the necessary steps to secure your account."),
-    ("Can you block my credit card?",
-     "Certainly, I'll go ahead and block your credit card. It will be effective immediately."),
-    ("What are the new offers on credit cards?",
-     "Here are the latest credit card offers: [List of offers]. Take advantage of these exclusive deals!"),
-    ("What types of credit cards do you offer?",
-     "We offer a range of credit cards, including rewards, cashback, and travel cards. Which category are you interested in?"),
-    ("Give me my credit card bill for this month.",
-     "Sure, your credit card bill for this month is $X.XX. Would you like a detailed breakdown of the transactions?"),
-    ("How can I increase my credit limit?",
-     "To increase your credit limit, you can request it through your online account or contact our customer service for assistance."),
-    ("What is the interest rate on my credit card?",
-     "The current interest rate on your credit card is X%. If you have any specific concerns, feel free to ask."),
-    ("Can I set up automatic payments for my credit card bills?",
-     "Absolutely, you can easily set up automatic payments through your online account. Let me guide you through the process if needed."),
-    ("What is the grace period for my credit card payments?",
-     "The grace period for your credit card payments is X days. During this period, no interest will be charged on your purchases."),
-    ("How can I dispute a transaction on my credit card?",
-     "If you need to dispute a transaction, please contact our customer service with details, and we'll assist you in resolving the issue."),
-    ("Can I upgrade my credit card?",
-     "Certainly! To explore upgrade options, log in to your account and check the 'Upgrade' section for available credit card upgrades."),
-    ("How can I check my credit card balance?",
-     "You can check your credit card balance by logging in to your online account or by contacting our automated phone service."),
-    ("Tell me about the rewards program tiers.",
-     "Our rewards program offers different tiers with varying benefits. Check the rewards program details on our website for information on each tier."),
-    ("What should I do if my credit card is about to expire?",
-     "If your credit card is about to expire, a new card will be automatically sent to your registered address. You can also request a replacement through customer service."),
-    ("Are there any introductory APR offers on my credit card?",
-     "Yes, there may be introductory APR offers. Check your account or our website for current promotions and their terms."),
-    ("Can I use my credit card for online purchases?",
-     "Absolutely! You can use your credit card for online purchases. Ensure that your billing information is up to date for a smooth transaction."),
-    ("Tell me about the credit card application process.",
-     "To apply for a credit card, visit our website and fill out the online application. You'll receive a response regarding your application status within [timeframe]."),
-    ("What rewards are available for redemption this month?",
-     "This month's available rewards include [list of rewards]. Check your rewards summary for detailed information on how to redeem them."),
-    ("How can I enroll in paperless statements?",
-     "To enroll in paperless statements, log in to your account, go to the 'Statements' section, and choose the paperless option. You'll receive statements via email."),
-    ("Tell me about the credit limit decrease process.",
-     "If you wish to decrease your credit limit, contact our customer service. Keep in mind that this may impact your credit utilization ratio."),
-    ("What steps should I take if I find an error on my credit card statement?",
-     "If you find an error on your statement, contact our customer service immediately. We'll investigate the issue and guide you through the resolution process."),
-    ("Can I request a credit card PIN change?",
-     "Yes, you can request a credit card PIN change through your online account or by contacting our customer service. Follow the instructions provided for security purposes."),
-    ("Tell me about the benefits of the travel insurance offered on my credit card.",
-     "The travel insurance on your credit card provides coverage for [specific benefits]. Review the travel insurance details on our website for comprehensive information."),
-    ("How do I set up a travel notification for my credit card?",
-     "To set up a travel notification, log in to your account and go to the 'Travel' or 'Account Settings' section. Provide your travel details to prevent any issues with transactions abroad."),
-    ("Can I request a credit card statement for the last six months?",
-     "Certainly! You can request a credit card statement for the last six months through your online account or by contacting our customer service."),
-    ("Tell me about the credit card rewards expiration policy.",
-     "Credit card rewards typically expire after [expiration period]. Make sure to review your rewards summary and redeem them before they expire."),
-    ("What is the difference between a credit card and a debit card?",
-     "A credit card allows you to borrow funds up to a set limit, while a debit card is linked to your bank account, and purchases are deducted directly from your account."),
-    ("Can I have an additional credit card for my spouse?",
-     "Yes, you can request an additional credit card for your spouse. Log in to your account and navigate to the 'Request Additional Card' section."),
-    ("Tell me about the benefits of the extended warranty on my credit card.",
-     "The extended warranty on your credit card offers additional coverage on eligible purchases. Check the terms and conditions on our website for specific details."),
-    ("How often is my credit score updated in my account?",
-     "Your credit score is typically updated monthly. You can view the latest score by logging in to your account and checking the 'Credit Score' or 'Account Overview' section."),
-    ("Can I set spending limits on my credit card?",
-     "Yes, you can set spending limits on your credit card for additional control. Log in to your account and navigate to the 'Card Settings' or 'Spending Controls' section."),
-    ("How can I apply for a new credit card?",
-     "To apply for a new credit card, visit our website and click on the 'Apply Now' button for the desired credit card. Follow the online application instructions."),
-    ("What documents do I need to apply for a credit card?",
-     "To complete your credit card application, you'll typically need proof of identity (e.g., driver's license), proof of income (e.g., pay stubs), and other relevant financial documents. Check the application page for specific requirements."),
-    ("How long does the credit card application process take?",
-     "The credit card application process usually takes [average time]. You'll receive a notification about your application status within [timeframe]. Feel free to check your application status online."),
-    ("Tell me about the credit card activation process.",
-     "Upon receiving your new credit card, you can activate it by visiting our website or calling the activation number provided on the card. Follow the prompts to complete the activation."),
-    ("What is the credit limit on the new credit card I applied for?",
-     "Your approved credit limit will be mentioned in the acceptance letter or email. Once you receive the card, you can also check the credit limit on your online account."),
-    ("Tell me about the benefits of the credit card I just applied for.",
-     "The credit card you applied for offers benefits such as [list of benefits]. Explore the credit card details on our website or in the provided materials for comprehensive information."),
-    ("How can I track the status of my credit card application?",
-     "To track the status of your credit card application, log in to your online account and navigate to the 'Application Status' or 'Check Application' section. You can also contact our customer service for updates."),
-    # Debit card
-    ("What is the balance on my debit card?",
-     "Your current debit card balance is $X.XX."),
-    ("Can I see the recent transactions on my debit card?",
-     "Certainly! Here is the list of your recent debit card transactions: ..."),
-    ("How do I activate my new debit card?",
-     "To activate your new debit card, you can use it at any ATM with your PIN or call our customer service hotline."),
-    ("Tell me about the benefits of my debit card.",
-     "Your debit card provides convenient access to your funds, allows cash withdrawals, and can be used for online and in-store purchases."),
-    ("Is there a daily withdrawal limit on my debit card?",
-     "Yes, there is a daily withdrawal limit of $X on your debit card. Contact customer service if you need to adjust this limit."),
-    ("Can I transfer money between my accounts using my debit card?",
-     "Yes, you can transfer money between your linked accounts through online banking or our mobile app."),
-    ("How do I report a lost or stolen debit card?",
-     "If your debit card is lost or stolen, please report it immediately by contacting our 24/7 customer service hotline."),
-    ("What is the process for disputing a transaction on my debit card?",
-     "If you need to dispute a transaction, contact our customer service with details, and we'll guide you through the dispute process."),
-    ("Tell me about the fees associated with using my debit card abroad.",
-     "There may be foreign transaction fees and ATM withdrawal fees when using your debit card abroad. Check our fee schedule for details."),
-    ("Can I set up alerts for transactions on my debit card?",
-     "Certainly! To set up transaction alerts for your debit card, log in to your online banking and navigate to the 'Alerts' or 'Notifications' section."),
-    ("What is the daily spending limit on my prepaid card?",
-     "Your prepaid card has a daily spending limit of $X.XX. If needed, you can adjust this limit through your online account."),
-    ("How can I reload funds onto my prepaid card?",
-     "You can reload funds onto your prepaid card through various methods, including direct deposit, bank transfers, or at authorized reload locations."),
-    ("Tell me about the expiration policy for my prepaid card.",
-     "Your prepaid card is valid until [expiration date]. Be sure to check your card for the expiration date and renew it if necessary."),
-    ("Is there a fee for checking the balance on my prepaid card?",
-     "Checking your prepaid card balance online or through our mobile app is usually free. Refer to our fee schedule for any associated charges."),
-    ("Can I use my prepaid card for online purchases?",
-     "Absolutely! Your prepaid card can be used for online purchases wherever debit or credit cards are accepted."),
-    ("How do I dispute a charge on my prepaid card?",
-     "If you need to dispute a charge, contact our customer service with details, and we'll assist you in resolving the issue."),
-    ("Tell me about the benefits of my prepaid card.",
-     "Your prepaid card offers benefits such as budgeting control, no overdraft fees, and the ability to make secure transactions without a bank account."),
-    ("What is the process for replacing a damaged prepaid card?",
-     "To request a replacement for your damaged prepaid card, contact our customer service, and we'll assist you in getting a new card."),
-    ("Can I use my forex card in multiple currencies?",
-     "Yes, your forex card is designed for use in multiple currencies. It automatically converts the transaction amount to the local currency."),
-    ("How can I check the balance on my forex card?",
-     "You can check your forex card balance by logging in to your online account or by contacting our customer service."),
-    ("Tell me about the fees associated with using my forex card abroad.",
-     "There may be foreign transaction fees and ATM withdrawal fees when using your forex card abroad. Refer to our fee schedule for details."),
-    ("Is there a limit on daily cash withdrawals with my forex card?",
-     "Yes, there is a daily cash withdrawal limit on your forex card. Check your card documentation or contact customer service for specific details."),
-    ("Can I reload additional funds onto my forex card while abroad?",
-     "Yes, you can reload additional funds onto your forex card through your online account, but availability may vary by location."),
-    ("What steps should I take if my forex card is lost or stolen?",
-     "If your forex card is lost or stolen, please report it immediately by contacting our 24/7 customer service hotline."),
-    ("Tell me about the benefits of using a forex card for international travel.",
-     "Using a forex card for international travel provides advantages such as competitive exchange rates, security, and the convenience of carrying multiple currencies."),
-    ("Can I set up travel alerts for my forex card?",
-     "Certainly! To set up travel alerts for your forex card, log in to your online account and navigate to the 'Travel' or 'Account Settings' section."),
-    ("What is the validity period of my forex card?",
-     "Your forex card is typically valid for [validity period]. Be sure to check the expiration date on your card and renew it if necessary."),
-    ("Tell me about the process of closing my forex card account.",
-     "To close your forex card account, contact our customer service, and we'll assist you in completing the necessary steps."),
-    ("Can I apply for a new debit card online?",
-    "Yes, you can apply for a new debit card online by logging in to your account or visiting our website's 'Apply for a Debit Card' section."),
-    ("What documents do I need to apply for a debit card?",
-     "To complete your debit card application, you'll typically need proof of identity (e.g., driver's license or passport) and proof of address (e.g., utility bill or bank statement). Check the application page for specific requirements."),
-    ("How long does the debit card application process take?",
-     "The debit card application process usually takes [average time]. You'll receive your new debit card by mail within [timeframe]. Feel free to check your application status online."),
-    ("Tell me about the activation process for my new debit card.",
-     "Upon receiving your new debit card, you can activate it by using it at any ATM with your PIN or by calling our customer service hotline."),
-    ("What is the daily spending limit on my debit card?",
-     "Your debit card has a daily spending limit of $X.XX. Contact customer service if you need to adjust this limit."),
-    ("Tell me about the benefits of the debit card I just applied for.",
-     "The debit card you applied for offers benefits such as [list of benefits]. Explore the debit card details on our website or in the provided materials for comprehensive information."),
-    ("How can I track the status of my debit card application?",
-     "To track the status of your debit card application, log in to your online account and navigate to the 'Application Status' or 'Check Application' section. You can also contact our customer service for updates."),
-    ("Can I request a replacement for my damaged debit card?",
-     "Certainly! To request a replacement for your damaged debit card, contact our customer service, and we'll assist you in getting a new card."),
-    ("Tell me about the fees associated with my debit card.",
-     "Your debit card may have fees such as ATM withdrawal fees or overdraft fees. Review our fee schedule for details on debit card-related charges."),
-    ("What is the process for upgrading my debit card?",
-     "To explore debit card upgrade options, log in to your account and check the 'Upgrade' or 'Card Services' section for available debit card upgrades."),
-    ("Can I customize the PIN for my debit card?",
-     "Yes, you can customize the PIN for your debit card. Visit an ATM or contact our customer service to set up a new PIN."),
-    ("Transfer 100 pounds to Aarya for groceries",
-     "Transfer initiated to specified account."),
-    ("Send 1000 pounds to Rishi",
-     "Initiating a transfer to specified account."),
-    ("Send forex transfer of 1000 GBP to INR to Pappa from my GBP account",
-     "'Forex transfer initiated."),
-    ("International transfer",
-     "Initiating an international transfer."),
-    ("Transfer 500 dollars to Emily for rent",
-     "Transfer initiated..."),
-    ("Send 200 euros to Maria",
-     "Sending money...."),
-    ("Can I apply for a credit card with joint account holders?",
-     "Yes, you can apply for a credit card with joint account holders. During the application process, choose the option for a joint account and provide the required information for the additional cardholder."),
-    ("What types of loans do you offer?",
-     "We offer a variety of loans, including home loans, car loans, personal loans, and property loans. Each type of loan has its own set of features and eligibility criteria."),
-     # Savings Account
-    ("How to open a savings account?",
-     "To open a savings account, visit our nearest branch with a valid ID proof, address proof, and a passport-sized photograph. You can also apply online through our website."),
-    ("What documents are required for a savings account?",
-     "To complete your savings account application, you'll typically need proof of identity (e.g., driver's license or passport) and proof of address (e.g., utility bill or bank statement). Check the application page for specific requirements."),
-    ("How long does the savings account opening process take?",
-     "The savings account opening process usually takes [average time]. You'll receive your account details and welcome kit by mail within [timeframe]. Feel free to check your application status online."),
-    ("Tell me about the process of closing my savings account.",
-     "To close your savings account, visit the branch where the account was opened, fill out the account closure form, and settle any outstanding transactions."),
-    ("How to check savings account balance?",
-     "Check your savings account balance through online banking, mobile banking apps, ATMs, or by visiting the nearest branch."),
-    ("Can I block my savings account?",
-     "If you need to block your savings account due to security concerns, contact our customer service immediately to report any unauthorized transactions."),
-    ("How to check eligibility for a savings account?",
-     "You can check your eligibility for a savings account by visiting our website or contacting our customer service. Eligibility criteria may vary."),
-    ("Tell me about the benefits of the savings account I just opened.",
-     "The savings account you opened offers benefits such as [list of benefits]. Explore the account details on our website or in the provided materials for comprehensive information."),
-    ("Can I customize the PIN for my savings account?",
-     "Yes, you can customize the PIN for your savings account. Visit an ATM or contact our customer service to set up a new PIN."),
-
-
-    # Checking Account
-    ("How to open a checking account?",
-     "Opening a checking account is easy! Visit our branch with a valid ID proof and address proof. You can also apply online through our website."),
-    ("What documents are required for a checking account?",
-     "To open a checking account, you'll typically need proof of identity (e.g., driver's license or passport) and proof of address (e.g., utility bill or bank statement). Additional documents may be required based on the account type."),
-    ("How long does the checking account opening process take?",
-     "The checking account opening process usually takes [average time]. You'll receive your account details and checks by mail within [timeframe]. Check your application status online."),
-    ("Tell me about the process of closing my checking account.",
-     "To close your checking account, visit the branch where the account was opened, fill out the account closure form, and ensure all outstanding checks and transactions are settled."),
-    ("How to check checking account balance?",
-     "Check your checking account balance through online banking, mobile banking apps, ATMs, or by visiting the nearest branch."),
-    ("Can I block my checking account?",
-     "If you need to block your checking account due to security concerns, contact our customer service immediately to report any unauthorized transactions."),
-    ("How to check eligibility for a checking account?",
-     "You can check your eligibility for a checking account by visiting our website or contacting our customer service. Eligibility criteria may vary based on the type of checking account."),
-    ("Tell me about the benefits of the checking account I just opened.",
-     "The checking account you opened offers benefits such as [list of benefits]. Explore the account details on our website or in the provided materials for comprehensive information."),
-    ("Can I customize the PIN for my checking account?",
-     "Yes, you can customize the PIN for your checking account. Visit an ATM or contact our customer service to set up a new PIN."),
-
-    # Mobile Banking
-    ("How to register for mobile banking?",
-     "Register for mobile banking by downloading our app and following the on-screen instructions. You'll need your account details and a valid phone number for verification."),
-    ("How to reset mobile banking password?",
-     "Reset your mobile banking password by selecting the 'Forgot Password' option on the login screen. Follow the prompts to verify your identity and set a new password."),
-    ("How to check eligibility for mobile banking?",
-     "To check your eligibility for mobile banking, ensure your account is active and contact our customer service if you encounter any issues."),
-    ("Can I block my mobile banking access?",
-     "If you suspect unauthorized access or need to block your mobile banking temporarily, contact our customer service immediately to initiate security measures."),
-    ("Tell me about the features of your mobile banking app.",
-     "Our mobile banking app offers features such as account balance checks, fund transfers, bill payments, and mobile check deposits. Explore the app for a seamless banking experience."),
-
-    # Closing Accounts
-    ("How to close my bank account?",
-     "To close your bank account, visit the branch where the account is held, fill out the account closure form, and ensure all outstanding transactions are settled."),
-    ("What is the process of closing a joint account?",
-     "Closing a joint account requires both account holders to visit the branch together, fill out the joint account closure form, and settle any outstanding transactions."),
-    ("How to close a fixed deposit account?",
-     "To close your fixed deposit account, visit the branch, fill out the closure form, and collect the maturity amount. Closing it prematurely may incur penalties."),
-    ("Can I reopen a closed bank account?",
-     "Generally, reopening a closed bank account is not possible. You may need to open a new account if needed."),
-    ("What happens to my credit card if I close my bank account?",
-     "Closing your bank account doesn't automatically close your credit card. You can still use your credit card as usual, and any outstanding dues need to be settled separately."),
-
-    # Miscellaneous
-    ("How to apply for a credit card?",
-     "Apply for a credit card online through our website or by visiting the nearest branch. Fill out the application form, provide necessary documents, and undergo the credit assessment process."),
-    ("What documents are required for a credit card application?",
-     "Credit card applications typically require proof of identity, address proof, income documents, and sometimes credit history reports."),
-    ("How to report a lost or stolen credit card?",
-     "If your credit card is lost or stolen, please report it immediately by contacting our 24/7 customer service hotline."),
-    ("Can I request a replacement for my damaged debit card?",
-     "Certainly! To request a replacement for your damaged debit card, contact our customer service, and we'll assist you in getting a new card."),
-    ("Tell me about the fees associated with my debit card.",
-     "Your debit card may have fees such as ATM withdrawal fees or overdraft fees. Review our fee schedule for details on debit card-related charges."),
-    ("What is the process for upgrading my debit card?",
-     "To explore debit card upgrade options, log in to your account and check the 'Upgrade' or 'Card Services' section for available debit card upgrades."),
-    ("Can I customize the PIN for my debit card?",
-     "Yes, you can customize the PIN for your debit card. Visit an ATM or contact our customer service to set up a new PIN."),
-
-    # Current Account
-    ("How to open a current account?",
-     "Opening a current account is easy! Visit our branch with a valid ID proof, address proof, and business registration documents. You can also apply online through our website."),
-    ("What documents are required for a current account?",
-     "To open a current account, you'll typically need proof of identity (e.g., driver's license or passport), proof of address (e.g., utility bill or bank statement), and business registration documents. Additional documents may be required based on the business type."),
-    ("How long does the current account opening process take?",
-     "The current account opening process usually takes [average time]. You'll receive your account details and business checks by mail within [timeframe]. Check your application status online."),
-    ("Tell me about the process of closing my current account.",
-     "To close your current account, visit the branch where the account was opened, fill out the account closure form, and ensure all outstanding transactions are settled."),
-    ("How to check current account balance?",
-     "Check your current account balance through online banking, mobile banking apps, ATMs, or by visiting the nearest branch."),
-    ("Can I block my current account?",
-     "If you need to block your current account due to security concerns, contact our customer service immediately to report any unauthorized transactions."),
-    ("How to check eligibility for a current account?",
-     "You can check your eligibility for a current account by visiting our website or contacting our customer service. Eligibility criteria may vary based on the type of current account and business type."),
-    ("Tell me about the benefits of the current account I just opened.",
-     "The current account you opened offers benefits such as [list of benefits]. Explore the account details on our website or in the provided materials for comprehensive information."),
-    ("Can I customize the PIN for my current account?",
-     "Yes, you can customize the PIN for your current account. Visit an ATM or contact our customer service to set up a new PIN."),
-
-    # Cheque
-    ("How to request a cheque book?",
-     "You can request a cheque book through online banking, mobile banking apps, ATMs, or by visiting the nearest branch. Alternatively, contact our customer service for assistance."),
-    ("What is the process of stopping a cheque?",
-     "To stop a cheque, log in to your online banking account, visit the nearest branch, or contact our customer service. Provide the cheque details and reason for stopping."),
-    ("How long does it take to receive a new cheque book?",
-     "You'll typically receive a new cheque book by mail within [timeframe] after placing a request. Check your request status online for updates."),
-    ("Tell me about the fees associated with a bounced cheque.",
-     "Fees for a bounced cheque may vary. Check our fee schedule or contact our customer service for details on cheque-related charges."),
-    ("Can I customize the design of my cheque book?",
-     "Customizing the design of your cheque book may be available. Check our website or contact our customer service for information on personalized cheque book options."),
-
-    # Overdraft
-    ("How to apply for an overdraft facility?",
-     "Apply for an overdraft facility by visiting our branch, contacting our customer service, or applying online through our website. Provide necessary financial documents and details."),
-    ("What documents are required for an overdraft application?",
-     "Overdraft applications typically require proof of income, financial statements, and details of the purpose for which the overdraft is needed."),
-    ("How is the interest calculated on an overdraft?",
-     "Interest on overdraft is typically calculated on the utilized amount and charged monthly. The interest rate may vary based on market conditions."),
-    ("Can I increase the overdraft limit on my account?",
-     "You can apply for an increase in the overdraft limit by contacting our customer service or using the online request form available in your account."),
-    ("Tell me about the benefits of an overdraft facility.",
-     "The overdraft facility provides flexibility in managing short-term financial needs. Explore our website or contact our customer service for details on overdraft benefits."),
-
-    # Certificate of Deposit
-    ("How to open a Certificate of Deposit (CD) account?",
-     "To open a Certificate of Deposit (CD) account, visit the branch or use our online banking platform. Provide your ID proof, address proof, and the amount you wish to deposit. Choose the tenure for your CD."),
-    ("What documents are required for a Certificate of Deposit account?",
-     "Opening a CD account typically requires ID proof, address proof, and the deposit amount. The CD tenure and interest payout options will be selected during account opening."),
-    ("Can I withdraw funds from a Certificate of Deposit before maturity?",
-     "Withdrawing funds from a CD before maturity may incur penalties. Contact the branch or customer service for information on early withdrawal penalties."),
-    ("How to renew a Certificate of Deposit?",
-     "Upon maturity, your CD will be automatically renewed for the same tenure. If you wish to make changes, contact the branch or use online banking to explore renewal options."),
-    ("Tell me about the interest rates for Certificate of Deposit.",
-     "Interest rates for CDs vary based on the tenure and prevailing market conditions. Check our website or contact our customer service for the current rates."),
-
-    # Joint Account
-    ("How to open a joint account?",
-     "Opening a joint account is simple! Both account holders need to visit the branch with valid ID proofs and address proofs. You can also apply online through our website."),
-    ("What documents are required for a joint account?",
-     "To open a joint account, each account holder typically needs proof of identity (e.g., driver's license or passport) and proof of address (e.g., utility bill or bank statement). Additional documents may be required."),
-    ("How long does the joint account opening process take?",
-     "The joint account opening process usually takes [average time]. You'll both receive your account details and welcome kits by mail within [timeframe]. Check your application status online."),
-    ("Tell me about the process of closing my joint account.",
-     "To close your joint account, both account holders need to visit the branch together, fill out the joint account closure form, and settle any outstanding transactions."),
-    ("How to check joint account balance?",
-     "Check your joint account balance through online banking, mobile banking apps, ATMs, or by visiting the nearest branch."),
-    ("Can I block my joint account?",
-     "If you need to block your joint account due to security concerns, contact our customer service immediately to report any unauthorized transactions."),
-    ("How to check eligibility for a joint account?",
-     "You can check your eligibility for a joint account by visiting our website or contacting our customer service. Eligibility criteria may vary based on the type of joint account."),
-    ("Tell me about the benefits of the joint account I just opened.",
-     "The joint account you opened offers benefits such as [list of benefits]. Explore the account details on our website or in the provided materials for comprehensive information."),
-    ("Can I customize the PIN for my joint account?",
-     "Yes, you can customize the PIN for your joint account. Visit an ATM or contact our customer service to set up a new PIN."),
-
-
-    # Fixed Deposit Account
-    ("How to open a fixed deposit account?",
-     "To open a fixed deposit account, visit the branch or use our online banking platform. Provide your ID proof, address proof, and the amount you wish to deposit. Choose the tenure and interest payout option."),
-    ("What documents are required for a fixed deposit account?",
-     "Opening a fixed deposit account typically requires ID proof, address proof, and the deposit amount. Additional documents may be needed for certain categories of customers."),
-    ("How to close a fixed deposit account?",
-     "To close your fixed deposit account, visit the branch, fill out the closure form, and collect the maturity amount. Closing it prematurely may incur penalties."),
-    ("How to check fixed deposit account details?",
-     "Check your fixed deposit details, including maturity date and interest earned, through online banking or by contacting our customer service."),
-    ("Can I customize the tenure for my fixed deposit?",
-     "The tenure for a fixed deposit is usually fixed at the time of opening. To make changes, you may need to prematurely close the existing deposit and open a new one with the desired tenure."),
-    ("Tell me about the interest rates for fixed deposits.",
-     "Interest rates for fixed deposits vary based on the tenure and prevailing market conditions. Check our website or contact our customer service for the current rates."),
-
-    # Recurring Deposit Account
-    ("How to open a Recurring Deposit (RD) account?",
-     "To open a Recurring Deposit (RD) account, visit the branch or use our online banking platform. Provide your ID proof, address proof, and the initial deposit amount. Choose the tenure for your RD."),
-    ("What documents are required for a Recurring Deposit account?",
-     "Opening an RD account typically requires ID proof, address proof, and the initial deposit amount. The RD tenure and installment amount will be selected during account opening."),
-    ("Can I increase the installment amount in a Recurring Deposit?",
-     "Increasing the installment amount in an RD may be possible. Contact the branch or customer service to explore options and procedures."),
-    ("How to close a Recurring Deposit account?",
-     "To close your RD account, visit the branch, fill out the closure form, and collect the maturity amount. Closing it prematurely may incur penalties."),
-    ("How to check Recurring Deposit account details?",
-     "Check your RD details, including upcoming installments and maturity date, through online banking or by contacting our customer service."),
-    ("Tell me about the interest rates for Recurring Deposit.",
-     "Interest rates for RDs vary based on the tenure and prevailing market conditions. Check our website or contact our customer service for the current rates."),
-
-    # Individual Retirement Account (IRA)
-    ("How to contribute to my IRA account?",
-     "Contribute to your IRA account through online banking, mobile apps, or by setting up automatic transfers. You can also make one-time contributions by visiting the branch."),
-    ("What is the maximum annual contribution limit for an IRA?",
-     "The maximum annual contribution limit for an IRA may vary based on your age and the type of IRA. Check our website or contact our customer service for the current limits."),
-    ("Can I have multiple IRAs?",
-    "Yes, you can have multiple IRAs. There are different types of IRAs, such as Traditional IRA, Roth IRA, and SEP IRA. Consult with a financial advisor to understand the best strategy for your retirement savings."),
-    ("Tell me about the tax benefits of contributing to an IRA.",
-    "Contributions to a Traditional IRA may be tax-deductible, and earnings grow tax-deferred. Roth IRA contributions are made with after-tax dollars, and qualified withdrawals are tax-free. Consult a tax advisor for personalized advice."),
-    ("How to change the investment allocation in my IRA?",
-    "You can change the investment allocation in your IRA through online banking, mobile apps, or by contacting our customer service. Review your investment strategy periodically to align with your retirement goals."),
-    ("Can I transfer my IRA from another financial institution?",
-    "Yes, you can transfer your IRA from another financial institution to our bank. Contact our customer service for assistance and guidance on the IRA transfer process."),
-    ("Tell me about the penalties for early withdrawal from an IRA.",
-    "Early withdrawal from an IRA before the age of 59½ may result in a 10% penalty in addition to income taxes. Certain exceptions apply, such as first-time home purchase or qualified education expenses."),
-    ("What happens to my IRA in case of my demise?",
-    "In the event of your demise, the beneficiary designated in your IRA will inherit the account. It's crucial to update your beneficiary information regularly to ensure your wishes are carried out."),
-    ("How to convert my Traditional IRA to a Roth IRA?",
-    "You can convert your Traditional IRA to a Roth IRA by contacting our customer service or using the online conversion tool. Be aware of the tax implications and consult with a financial advisor."),
-    ("Tell me about the perks of having an IRA with senior citizen benefits.",
-    "An IRA with senior citizen benefits may offer additional perks such as preferential interest rates, waived fees, and personalized financial advice. Explore our senior citizen banking offerings for comprehensive information."),
-
-    # Senior Citizen Bank Account
-    ("How to open a Senior Citizen Bank Account?",
-    "Opening a Senior Citizen Bank Account is easy! Visit our nearest branch with a valid ID proof, address proof, and age verification document. You can also apply online through our website."),
-    ("What documents are required for a Senior Citizen Bank Account?",
-    "To open a Senior Citizen Bank Account, you'll typically need proof of identity (e.g., driver's license or passport), proof of address (e.g., utility bill or bank statement), and a document verifying your age (e.g., birth certificate or senior citizen card)."),
-    ("How long does the Senior Citizen Bank Account opening process take?",
-    "The Senior Citizen Bank Account opening process usually takes [average time]. You'll receive your account details and welcome kit by mail within [timeframe]. Feel free to check your application status online."),
-    ("Tell me about the perks of having a Senior Citizen Bank Account.",
-    "A Senior Citizen Bank Account may offer perks such as higher interest rates on deposits, special discounts on banking services, and priority customer service. Explore our senior citizen banking offerings for comprehensive information."),
-    ("Can I have joint ownership of a Senior Citizen Bank Account?",
-    "Yes, you can have joint ownership of a Senior Citizen Bank Account. Both account holders need to meet the senior citizen criteria. Visit the branch or apply online to open a joint senior citizen account."),
-    ("How to check eligibility for a Senior Citizen Bank Account?",
-    "You can check your eligibility for a Senior Citizen Bank Account by visiting our website or contacting our customer service. Eligibility criteria may include age requirements and additional documentation."),
-    ("How to close a Senior Citizen Bank Account?",
-    "To close your Senior Citizen Bank Account, visit the branch where the account was opened, fill out the account closure form, and settle any outstanding transactions. Ensure you provide the necessary identification."),
-    ("How to block transactions on my Senior Citizen Bank Account?",
-    "If you need to block transactions on your Senior Citizen Bank Account due to security concerns, contact our customer service immediately to report any unauthorized transactions."),
-    ("How to request a replacement for a lost Senior Citizen Bank Account card?",
-    "To request a replacement for a lost Senior Citizen Bank Account card, contact our customer service, and we'll assist you in getting a new card."),
-    ("Tell me about the fees associated with a Senior Citizen Bank Account.",
-    "Your Senior Citizen Bank Account may have fees such as ATM withdrawal fees or overdraft fees. Review our fee schedule for details on senior citizen account-related charges."),
-    ("Is there a special interest rate for senior citizens on savings accounts?",
-    "Yes, senior citizens enjoy a special higher interest rate on savings accounts. Check our current rates to see the benefits offered for your savings."),
-    ("Do senior citizens get additional discounts on banking services?",
-    "Absolutely! Senior citizens are eligible for additional discounts on various banking services, including transaction fees, locker rentals, and more. Explore our senior citizen banking benefits."),
-    ("Are there exclusive perks for senior citizens on fixed deposits?",
-    "Yes, senior citizens receive exclusive perks on fixed deposits, such as higher interest rates. Check our current rates and terms for senior citizen fixed deposit benefits."),
-    ("Tell me about the special offers on loans for senior citizens.",
-    "Senior citizens may enjoy special offers on loans, including lower interest rates and flexible repayment options. Contact our customer service or visit the branch for personalized loan offers."),
-    ("Are there any fee waivers for senior citizens on debit cards?",
-    "Certainly! Senior citizens often benefit from fee waivers on debit card transactions, annual fees, and other related charges. Review our fee schedule for details on senior citizen account privileges."),
-    ("Do senior citizens receive priority customer service?",
-    "Absolutely! Senior citizens receive priority customer service with dedicated helplines, faster response times, and personalized assistance. Experience banking with the care you deserve."),
-    ("Are there special events or workshops for senior citizens account holders?",
-    "Yes, we regularly organize special events, workshops, and social gatherings exclusively for our senior citizen account holders. Stay updated on our events calendar for exciting activities."),
-    ("Tell me about the healthcare benefits for senior citizens with your bank.",
-    "Senior citizens banking with us may enjoy healthcare benefits, including discounts on health insurance premiums, wellness programs, and partnerships with healthcare providers. Explore our health and wellness offerings."),
-    ("Are there any travel benefits for senior citizens with your bank?",
-    "Yes, senior citizens often enjoy travel benefits, including discounts on travel insurance, preferential forex rates, and exclusive travel packages. Check our travel-related offers for senior citizens."),
-    ("Tell me about the exclusive lifestyle privileges for senior citizens.",
-    "Our senior citizen account holders receive exclusive lifestyle privileges, including discounts on shopping, dining, entertainment, and more. Explore our partner network for exciting offers."),
-
-    # Loans
-    ("Tell me about the interest rates on home loans.",
-     "The interest rates on our home loans vary depending on factors such as the loan amount, tenure, and your credit score. You can check our website or contact our loan department for specific details."),
-    ("Can I apply for a car loan with your institution?",
-     "Certainly! We provide car loans with competitive interest rates. You can apply for a car loan through our online application process or visit one of our branches for assistance."),
-    ("What is the maximum loan amount for a personal loan?",
-     "The maximum loan amount for a personal loan depends on your income, credit history, and other factors. You can check our website or contact our loan specialists to discuss your specific requirements."),
-    ("Tell me about the eligibility criteria for property loans.",
-     "To be eligible for a property loan, you need to meet certain criteria related to your income, creditworthiness, and the property's value. Contact our loan department for a detailed discussion on eligibility."),
-    ("How long does the loan approval process take?",
-     "The loan approval process duration varies based on the type of loan and the completeness of your application. Generally, it takes [average time]. You can track your application status through our online portal."),
-    ("What is the minimum down payment required for a home loan?",
-     "The minimum down payment for a home loan is typically a percentage of the property's value. The exact amount depends on various factors. You can find specific details on our website or by contacting our loan team."),
-    ("Tell me about the repayment options for car loans.",
-     "We offer flexible repayment options for car loans, including monthly installments and customized plans. You can choose the option that best suits your financial situation. Contact our loan department for further details."),
-    ("Are there any prepayment penalties on personal loans?",
-     "Our personal loans come with the flexibility to prepay without any penalties. You can make partial or full prepayments to reduce the loan tenure. Check your loan agreement for specific terms."),
-    ("What documents are required for a property loan application?",
-     "To apply for a property loan, you generally need documents such as income proof, property documents, identity proof, and more. Visit our website or contact our loan specialists for a complete list of required documents."),
-    ("Tell me about the interest rates for loans on commercial properties.",
-     "Interest rates for loans on commercial properties are determined based on various factors such as the loan amount, tenure, and the property's financial viability. Contact our loan department for specific details."),
-    ("Can I get a loan for home renovations?",
-     "Yes, we offer home renovation loans with attractive interest rates. You can apply for a home renovation loan to fund improvements, repairs, or expansions. Check our website or contact our loan team for more information."),
-    ("What is the maximum loan tenure for personal loans?",
-     "The maximum loan tenure for personal loans depends on the loan amount and your repayment capacity. Generally, personal loans have tenures ranging from [minimum tenure] to [maximum tenure]. Contact our loan department for specific details."),
-    ("Tell me about the types of collateral accepted for secured loans.",
-     "We accept various types of collateral for secured loans, including real estate, vehicles, and other valuable assets. The type of collateral accepted may vary based on the loan type. Contact our loan specialists for detailed information."),
-    ("How can I check the status of my loan application?",
-     "You can check the status of your loan application through our online portal. Additionally, our loan department is available to provide updates and assistance. Feel free to contact us for any queries regarding your application."),
-    ("Can I apply for a loan online?",
-     "Yes, you can conveniently apply for a loan online through our secure application portal. Simply visit our website, fill out the online application form, and submit the required documents. Our loan team will guide you through the process."),
-    ("Tell me about the benefits of taking a loan with your institution.",
-     "Taking a loan with us comes with benefits such as competitive interest rates, flexible repayment options, and personalized customer service. Explore our loan offerings on our website or contact our loan specialists for more details."),
-    ("Are there any special offers or discounts on home loans?",
-     "We periodically offer special promotions and discounts on home loans. Check our website or contact our loan department to inquire about any ongoing offers or exclusive deals for homebuyers."),
-    ("How is the interest calculated on car loans?",
-     "Interest on car loans is typically calculated using a fixed or floating rate, depending on the loan agreement. The interest is applied to the outstanding balance. You can find detailed information in your loan agreement or contact our loan team."),
-    ("Tell me about the loan application processing fees.",
-     "Loan application processing fees vary depending on the type of loan and the amount. You can find information on processing fees in our loan documentation. Feel free to contact our loan specialists for a breakdown of applicable fees."),
-    ("Can I get a loan for educational purposes?",
-     "Yes, we offer education loans to support your educational expenses. Whether it's tuition fees, accommodation, or other educational costs, our education loans come with competitive terms. Visit our website or contact our loan department for more details."),
-    ("What is the maximum loan-to-value ratio for property loans?",
-     "The maximum loan-to-value ratio for property loans depends on factors such as the type of property and the loan amount. You can find specific details in our loan documentation or by contacting our loan specialists."),
-    ("Tell me about the process for refinancing a loan.",
-     "The process for refinancing a loan involves assessing your current loan, applying for a new loan with better terms, and paying off the existing loan. Contact our loan department for a consultation on whether refinancing is suitable for you."),
-    ("Can I get a loan if I have a low credit score?",
-     "While a low credit score may affect your eligibility, we consider various factors during the loan approval process. You can discuss your specific situation with our loan specialists to explore available options."),
-    ("What is the minimum loan amount for personal loans?",
-     "The minimum loan amount for personal loans depends on the loan type and your eligibility. Generally, personal loans have a minimum amount, and you can find specific details on our website or by contacting our loan team."),
-    ("Tell me about the insurance options available with home loans.",
-     "We offer insurance options such as home insurance and mortgage protection insurance with our home loans. These options provide coverage for unforeseen events. Contact our loan department to discuss insurance offerings in detail."),
-    ("Are there any pre-approved loan offers available?",
-     "We periodically provide pre-approved loan offers to eligible customers. Check your account or contact our loan specialists to inquire about any pre-approved loan options available to you."),
-    ("How can I calculate the EMI for a loan?",
-     "You can use our online loan EMI calculator available on our website to estimate your monthly installment for a loan. Simply input the loan amount, tenure, and interest rate to get an instant EMI calculation."),
-    ("Tell me about the foreclosure process for car loans.",
-     "Foreclosure for car loans involves repaying the outstanding loan amount before the scheduled tenure ends. Contact our loan department for details on the foreclosure process, including any applicable fees or charges."),
-    ("What is the loan disbursement timeline for personal loans?",
-     "The loan disbursement timeline for personal loans depends on the completion of the documentation and verification process. Generally, personal loan disbursement occurs within [average time]. Contact our loan team for specific details."),
-    ("Can I get a loan with a co-applicant?",
-     "Yes, you can apply for a loan with a co-applicant, which can enhance your eligibility. The co-applicant's income and creditworthiness are considered during the loan approval process. Contact our loan specialists for more information."),
-    ("Tell me about the terms and conditions for property loan prepayment.",
-     "Property loan prepayment terms and conditions may vary. Some loans allow prepayment without penalties, while others may have specific conditions. Check your loan agreement or contact our loan department for detailed information."),
-    ("What is the maximum loan tenure for car loans?",
-     "The maximum loan tenure for car loans depends on factors such as the loan amount and the type of vehicle. Generally, car loan tenures range from [minimum tenure] to [maximum tenure]. Contact our loan specialists for specific details."),
-    ("Are there any special offers for first-time homebuyers?",
-     "Yes, we often have special offers and discounts for first-time homebuyers. Check our website or contact our loan department to inquire about any exclusive deals or promotions available for first-time homebuyers."),
-    ("How can I update my contact information for loan-related communication?",
-     "To update your contact information, log in to your online account or contact our customer service. It's important to keep your information up-to-date to ensure you receive timely loan-related communications."),
-    ("Tell me about the process for loan assumption.",
-     "Loan assumption involves a new borrower taking over the existing loan. The process includes assessing the new borrower's eligibility and obtaining approval from our loan department. Contact us for detailed information on loan assumption."),
-    ("Can I get a loan for purchasing a second home?",
-     "Yes, we offer loans for purchasing second homes. The eligibility criteria and terms may vary. Contact our loan specialists to discuss your specific requirements for a loan on a second home."),
-    ("What is the process for getting a loan statement?",
-     "You can easily obtain a loan statement by logging in to your online account or contacting our loan department. Loan statements provide details on your outstanding balance, payments made, and other relevant information."),
-    ("Tell me about the benefits of opting for a fixed interest rate on loans.",
-     "Opting for a fixed interest rate provides stability, as your EMI remains constant throughout the loan tenure. It shields you from interest rate fluctuations. Contact our loan specialists to discuss the benefits of fixed-rate loans in detail."),
-    ("How can I avail of top-up loans on my existing home loan?",
-     "Availing top-up loans on your existing home loan is a convenient way to access additional funds. You can apply for a top-up loan through our online portal or by contacting our loan department for assistance."),
-    ("Can I prepay a part of my car loan?",
-     "Yes, you can make partial prepayments on your car loan. This helps reduce the outstanding principal amount and may lead to interest savings. Check your loan agreement for details on partial prepayment terms."),
-    ("Tell me about the benefits of taking a joint home loan.",
-     "Taking a joint home loan with a co-applicant, such as a spouse, can enhance your eligibility and increase the loan amount. Additionally, both applicants share the responsibility for loan repayment. Contact our loan specialists for detailed information."),
-    ("What is the loan-to-value ratio for car loans?",
-     "The loan-to-value ratio for car loans depends on factors such as the type of vehicle and the loan amount. Generally, the ratio ranges from [minimum ratio] to [maximum ratio]. Contact our loan specialists for specific details."),
-    ("Are there any special discounts for loyalty customers applying for loans?",
-     "Yes, we offer special discounts and benefits for loyal customers applying for loans. Check your account or contact our loan department to inquire about any exclusive offers available to our loyal customers."),
-    ("How can I request a loan amortization schedule?",
-     "You can request a loan amortization schedule by contacting our loan department. The schedule provides a detailed breakdown of your EMI payments, interest, and outstanding balance over the loan tenure."),
-    ("Tell me about the benefits of opting for a floating interest rate on loans.",
-     "Opting for a floating interest rate allows you to benefit from interest rate fluctuations. It may result in lower EMIs during periods of decreasing interest rates. Contact our loan specialists to discuss the advantages of floating-rate loans."),
-    ("Can I transfer my existing home loan to your institution for better terms?",
-     "Yes, you can consider transferring your existing home loan to our institution through the loan balance transfer process. This may provide you with better terms and interest rates. Contact our loan specialists for assistance."),
-    ("What is the process for loan foreclosure on personal loans?",
-     "Loan foreclosure on personal loans involves repaying the entire outstanding amount before the scheduled tenure ends. There may be specific terms and conditions. Contact our loan department for detailed information on personal loan foreclosure."),
-    ("Can I get a loan for purchasing commercial property?",
-     "Yes, we offer loans for purchasing commercial properties. The eligibility criteria and terms may vary. Contact our loan specialists to discuss your specific requirements for a loan on commercial property."),
-    ("Tell me about the benefits of taking a loan for debt consolidation.",
-     "Taking a loan for debt consolidation allows you to combine multiple debts into a single loan with a potentially lower interest rate. It simplifies your finances and may reduce your overall interest payments. Contact our loan specialists for more information."),
-    ("How can I change the tenure of my personal loan?",
-     "You can request a change in the tenure of your personal loan by contacting our loan department. However, changes may be subject to approval and certain conditions. Reach out to us for assistance in modifying your loan tenure."),
-    ("What is the process for getting a loan against property?",
-     "The process for getting a loan against property involves assessing the property's value, your eligibility, and completing the required documentation. Contact our loan specialists to discuss the specific steps and requirements."),
-    ("Can I get a loan if I am self-employed?",
-     "Yes, we offer loans to self-employed individuals. The eligibility criteria may vary, and we consider factors such as income stability and business performance. Contact our loan specialists to discuss loan options for self-employed individuals."),
-    ("Tell me about the benefits of taking a loan for home extension.",
-     "Taking a loan for home extension provides funds for expanding or renovating your existing home. It can enhance your living space and property value. Contact our loan specialists to explore the benefits and terms of home extension loans."),
-    ("What is the interest rate for a car loan?",
-     "The interest rate for a car loan depends on various factors such as your credit score, the loan amount, and the loan tenure. Contact our loan department for personalized information on car loan interest rates."),
-    ("Can I apply for a loan online?",
-     "Yes, you can apply for a loan online through our official website. The online application process is secure and convenient. Visit our website to start your loan application."),
-    ("Tell me about the repayment options for personal loans.",
-     "Repayment options for personal loans include monthly installments. You can choose a tenure and EMI plan that suits your financial situation. Contact our loan specialists for assistance in selecting the right repayment option."),
-    ("What documents are required for a home loan application?",
-     "The documents required for a home loan application typically include proof of identity, address, income, and property documents. Contact our loan department for a detailed list of documents needed for your home loan application."),
-    ("Is it possible to prepay a loan before the tenure ends?",
-     "Yes, you can prepay a loan before the tenure ends. However, prepayment may be subject to certain terms and conditions, and there may be prepayment charges. Contact our loan specialists for information on loan prepayment."),
-    ("Can I get a loan with a low credit score?",
-     "Loan approval with a low credit score depends on various factors. We offer options for individuals with less-than-perfect credit. Contact our loan specialists to discuss available loan options based on your credit situation."),
-    ("Tell me about the benefits of a fixed-rate mortgage.",
-     "A fixed-rate mortgage offers the advantage of a constant interest rate throughout the loan tenure. It provides stability in monthly payments, making it easier to plan your finances. Contact our loan specialists to explore the benefits of a fixed-rate mortgage."),
-    ("How does the loan approval process work?",
-     "The loan approval process involves submitting an application, document verification, and credit assessment. Approval is based on factors such as income, credit history, and eligibility criteria. Contact our loan specialists for a step-by-step guide on the loan approval process."),
-    ("Can I get a personal loan for a vacation?",
-     "Yes, you can apply for a personal loan to fund your vacation. Personal loans offer flexibility in usage, and you can use the funds for various purposes, including travel. Contact our loan department to explore personal loan options for your vacation."),
-    ("What is the interest rate for a personal loan?",
-     "The interest rate for a personal loan varies based on factors like credit score and loan amount. Contact our loan department for personalized information on personal loan interest rates."),
-    ("Can I get a loan for starting a small business?",
-     "Yes, we offer loans for entrepreneurs looking to start or expand a small business. Contact our business loan specialists for details on eligibility and terms."),
-    ("Tell me about the benefits of a home equity loan.",
-     "A home equity loan allows you to borrow against the equity in your home. It's useful for major expenses like home renovations. Contact our loan specialists to explore the benefits of a home equity loan."),
-    ("How long does it take to get approval for a loan?",
-     "The time for loan approval varies based on the type of loan and documentation. Contact our loan department for an estimate of the approval timeline for your specific loan application."),
-    ("Can I get a loan if I have no credit history?",
-     "While having no credit history can be a factor, we offer options for individuals with limited credit history. Contact our loan specialists to discuss available loan options based on your financial situation."),
-    ("Tell me about the benefits of a variable-rate mortgage.",
-     "A variable-rate mortgage offers the advantage of potential interest rate decreases, which can result in lower monthly payments. Contact our loan specialists to explore the benefits of a variable-rate mortgage."),
-    ("What is the maximum loan amount for a car loan?",
-     "The maximum loan amount for a car loan depends on factors such as your income and the value of the car. Contact our loan department for information on the maximum loan amount you can qualify for."),
-    ("Is there a penalty for repaying a loan early?",
-     "Some loans may have prepayment penalties. Contact our loan specialists to understand the terms and conditions related to early repayment for your specific loan."),
-    ("Can I get a loan if I'm a first-time homebuyer?",
-     "Yes, we offer special programs for first-time homebuyers. Contact our mortgage specialists to discuss the available loan options and assistance programs for first-time buyers."),
-    ("Tell me about the benefits of a student loan consolidation.",
-     "Consolidating student loans can simplify repayment by combining multiple loans into one. Contact our loan specialists to explore the benefits and options for student loan consolidation."),
-    ("How does the loan underwriting process work?",
-     "Loan underwriting involves assessing your creditworthiness and financial situation. Contact our loan specialists for a detailed explanation of the loan underwriting process and criteria."),
-    ("Can I get a loan with a co-signer?",
-     "Yes, having a co-signer can enhance your chances of loan approval, especially if you have limited credit history. Contact our loan specialists to discuss the requirements and benefits of having a co-signer."),
-    ("Tell me about the benefits of a business expansion loan.",
-     "A business expansion loan provides funds for growing your business operations. Contact our business loan specialists to explore the benefits and terms of a business expansion loan."),
-    ("What is the loan-to-value (LTV) ratio for a home loan?",
-     "The loan-to-value ratio for a home loan is the ratio of the loan amount to the appraised value of the property. Contact our mortgage specialists for information on LTV ratios and how they impact your loan terms."),
-    ("Is there a grace period for loan payments?",
-     "Some loans may have a grace period, allowing for a brief delay in payments without incurring penalties. Contact our loan specialists to understand the terms related to grace periods for your specific loan."),
-    ("Can I refinance my existing mortgage?",
-     "Yes, you can refinance your existing mortgage to potentially get a lower interest rate or change the loan terms. Contact our mortgage specialists to discuss the refinancing options available to you."),
-    ("Tell me about the benefits of a business equipment loan.",
-     "A business equipment loan provides funds for purchasing or upgrading business equipment. Contact our business loan specialists to explore the benefits and terms of a business equipment loan."),
-    ("How can I improve my credit score to qualify for a loan?",
-     "Improving your credit score involves managing debts, making timely payments, and monitoring your credit report. Contact our credit counseling services for guidance on improving your credit score for loan eligibility."),
-    ("What is the eligibility criteria for a personal loan?",
-     "The eligibility criteria for a personal loan include factors like income, credit score, and employment status. Contact our loan specialists to understand the specific eligibility criteria for personal loans."),
-    ("Tell me about the benefits of an FHA loan for homebuyers.",
-     "An FHA loan is a government-backed mortgage with lower down payment requirements. Contact our mortgage specialists to explore the benefits and eligibility criteria for FHA loans."),
-    ("Can I get a loan for debt consolidation if I have multiple debts?",
-     "Yes, debt consolidation loans help combine multiple debts into a single loan with a potentially lower interest rate. Contact our loan specialists to discuss options for debt consolidation based on your financial situation."),
-    ("How does the loan disbursement process work?",
-     "The loan disbursement process involves transferring approved loan funds to your account. Contact our loan department for details on the disbursement process and the timeline for receiving your loan amount."),
-    ("What is the maximum loan tenure for a personal loan?",
-     "The maximum loan tenure for a personal loan depends on the lender's policies and the type of personal loan. Contact our loan specialists for information on the maximum tenure available for personal loans."),
-    ("Tell me about the benefits of an unsecured business loan.",
-     "An unsecured business loan doesn't require collateral and offers flexibility. Contact our business loan specialists to explore the benefits and terms of an unsecured business loan."),
-    ("Can I get a loan if I'm retired and on a fixed income?",
-     "Yes, retirees can qualify for loans based on their fixed income and creditworthiness. Contact our loan specialists to discuss loan options tailored to retirees and the specific documentation required."),
-    ("What is the difference between a fixed-rate and adjustable-rate mortgage?",
-     "A fixed-rate mortgage has a constant interest rate, while an adjustable-rate mortgage may change over time. Contact our mortgage specialists to understand the differences and determine which option suits your needs."),
-    ("Is there a prepayment penalty for home loans?",
-     "Some home loans may have prepayment penalties. Contact our mortgage specialists to understand the terms related to prepayment penalties and whether they apply to your specific home loan."),
-    ("Tell me about the benefits of a business line of credit.",
-     "A business line of credit provides flexible access to funds for day-to-day operations. Contact our business loan specialists to explore the benefits and terms of a business line of credit."),
-    ("How can I check my credit score before applying for a loan?",
-     "You can check your credit score through credit reporting agencies. Contact our credit counseling services for guidance on obtaining and understanding your credit report before applying for a loan."),
-    ("What is the process for getting a personal loan with bad credit?",
-     "While having bad credit can pose challenges, there are options for obtaining a personal loan. Contact our loan specialists to discuss available solutions and steps to secure a personal loan with bad credit."),
-    ("Can I get a loan for home renovation projects?",
-     "Yes, we offer loans specifically for home renovation projects. Contact our loan specialists to discuss the available loan options and terms for financing your home improvement plans."),
-    ("Tell me about the benefits of a jumbo mortgage for luxury homes.",
-     "A jumbo mortgage is designed for high-value homes, offering larger loan amounts. Contact our mortgage specialists to explore the benefits and eligibility criteria for jumbo mortgages."),
-    ("How does the loan application process work for business loans?",
-     "The business loan application process involves submitting financial documents and a business plan. Contact our business loan specialists for a step-by-step guide on applying for business loans and the required documentation."),
-    ("What is the difference between a secured and unsecured loan?",
-     "A secured loan requires collateral, while an unsecured loan does not. Contact our loan specialists to understand the differences and determine which type of loan aligns with your financial needs."),
-    ("Is there a minimum credit score requirement for mortgage loans?",
-     "Mortgage lenders may have minimum credit score requirements. Contact our mortgage specialists to understand the specific credit score requirements for mortgage loans and how they may impact your eligibility."),
-    ("Tell me about the benefits of an SBA loan for small businesses.",
-     "SBA loans provide government-backed funding for small businesses. Contact our business loan specialists to explore the benefits and eligibility criteria for Small Business Administration (SBA) loans."),
-    ("How to apply for an education loan?",
-     "To apply for an education loan, visit our website or the nearest branch to access the application form. Complete the required documentation, including proof of admission and course details. Our loan specialists will guide you through the process."),
-    ("What is the interest rate on education loans?",
-     "The interest rate on education loans varies and depends on factors such as the loan amount, tenure, and your credit history. Contact our loan department or check our website for the most up-to-date interest rates."),
-    ("How is the EMI cost calculated for education loans?",
-     "The EMI (Equated Monthly Installment) for education loans is calculated based on the loan amount, interest rate, and tenure. You can use our online EMI calculator on the website to get an estimate of your monthly installment."),
-    ("How can I exit my education loan?",
-     "To exit your education loan, you need to repay the entire outstanding amount. You can choose to make prepayments or pay the loan in full. Contact our loan department for details on the repayment process and any applicable charges."),
-    ("Is there a difference between SWIFT and IBAN for international transfers?",
-     "Yes, SWIFT (Society for Worldwide Interbank Financial Telecommunication) and IBAN (International Bank Account Number) serve different purposes. SWIFT is used for bank identification, while IBAN is the recipient's unique account number. Both are essential for international transfers."),
-    ("Can I initiate an international money transfer over the phone?",
-     "Yes, you can initiate an international money transfer over the phone by contacting our customer support. Follow the instructions provided by the customer support representative to verify your identity and complete the transfer."),
-    ("How can I initiate an international money transfer?",
-     "To initiate an international money transfer, log in to our online banking portal and navigate to the 'International Transfers' or 'Send Money Abroad' section. Follow the prompts, provide the recipient's details, and select the destination country."),
-    ("What information do I need for an international money transfer?",
-     "For an international money transfer, you typically need the recipient's full name, international bank account number (IBAN), bank name, branch details, and the destination country. Double-check the details to ensure a smooth transfer."),
-    ("Is there a fee for international money transfers?",
-    "Yes, international money transfers usually involve fees. Review our fee schedule or contact our customer support for information on fees associated with sending money abroad. Currency conversion fees may also apply."),
-    ######
-    #Trasactions
-    ("How can I check my recent transactions?",
-    "You can check your recent transactions by logging in to your online banking account and navigating to the 'Transactions' or 'Account Activity' section. There, you'll find a list of your most recent transactions with details like date, amount, and merchant information."),
-
-    ("Where can I view my transaction history?",
-    "Your transaction history is available in your online banking account. Simply log in and go to the 'Transaction History' or 'Account Activity' section to view a comprehensive list of your past transactions."),
-
-    ("How do I access my bank statements?",
-    "To access your bank statements, log in to your online banking account and go to the 'Statements' or 'Documents' section. You can download and view your statements in a printable format."),
-
-    ("How can I check if I've received money from someone?",
-    "You can check if you've received money by reviewing your transaction history in the online banking account. Look for incoming transactions or payments from other users."),
-
-    ("What is the process for transferring money to a friend?",
-    "To transfer money to a friend, use the 'Transfer' or 'Send Money' feature in your online banking. Enter your friend's account details and the amount you want to transfer. Follow the on-screen prompts to complete the transaction."),
-
-
-
-
-
-
-
-
-
-]
-
-# Train the machine learning models
-banking_chatbot.train_ml_models(dataset)
-
-#
-# print(" ")
-# print("Welcome to the Banking Chatbot!")
-# print(" ")
-# print("We're delighted to assist you with all your queries and needs.\nFeel free to ask any questions or seek help regarding our services. ")
-# print(" ")
-# print("Type 'quit', 'exit', 'q' to exit the chatbot")
-# print("____________________________________________________________________")
-# print(" ")
-#
-# while True:
-#     user_input = input('You: ')
-#
-#     # Check if the user wants to quit
-#     if user_input.lower() in ['quit', 'exit', 'q']:
-#         print('Exiting the chatbot. Goodbye!')
-#         break
-#
-#     # Get the chatbot's response
-#     response = banking_chatbot.respond(user_input)
-#
-#     # Print the response
-#     print('Bot:', response)
-
-def print_with_delay(text, delay=0.03):
-    for char in text:
-        print(char, end='', flush=True)
-        time.sleep(delay)
-    print()
+        return self.intents[self.predict_vector(self.vectorize([query]), models=('rf',))['rf'][0]]
+
+    def predict_knn_response(self, query, k=1):
+        # The k closest FAQ answers with their cosine similarity, best first
+        intents, scores = self.knn_model.search(self.vectorize([query]), k)
+        return [(self.intents[intent_id], float(score)) for intent_id, score in zip(intents[0], scores[0])]
+
+    def format_response(self, answers):
+        # answers holds (model name, intent ID, score) for every model consulted
+        parts = []
+        for name, intent_id, score in answers:
+            text = f'{MODEL_LABELS[name]}: {self.intents[intent_id]}'
+            if name == 'knn':
+                text += f' (similarity {score:.2f})'
+            parts.append(text)
+        return 'Responding - ' + ', '.join(parts)
+
+    def render(self, result):
+        # The reply text for a ChatResult: every model's answer, or just the answer when the
+        # result has no per-model predictions
+        if not result.predictions:
+            return result.answer
+        return self.format_response(result.predictions)
+
+    def _answer_batch(self, messages, cache_key, decide):
+        # Shared by respond_batch and respond_cascade_batch: cached results are reused and exact matches
+        # are answered straight from the lookup table. Only the rest are vectorized and handed to
+        # decide(X), which returns a (model, intent ID, confidence, predictions) per row
+        start = time.perf_counter()
+        metrics = self.metrics
+        if metrics is not None:
+            lap = start
+        results = [None] * len(messages)
+        answers = {}
+        pending = []
+        for row, message in enumerate(messages):
+            if self.response_cache is not None:
+                results[row] = self.response_cache.get((message, cache_key))
+                if results[row] is not None:
+                    continue
+            intent_id = self.exact_answers.get(normalize_query(message))
+            if intent_id is None:
+                pending.append(row)
+                self.exact_misses += 1
+            else:
+                # No model ran, so there are no per-model predictions to report
+                answers[row] = ('exact', int(intent_id), 1.0, ())
+                self.exact_hits += 1
+        if metrics is not None:
+            lap = metrics.record('normalize', lap)
+
+        if pending:
+            X = self.vectorize([messages[row] for row in pending])
+            if metrics is not None:
+                lap = metrics.record('vectorize', lap)
+            for row, answer in zip(pending, decide(X)):
+                answers[row] = answer
+            if metrics is not None:
+                lap = time.perf_counter()
+
+        seconds = time.perf_counter() - start
+        for row, (model, intent_id, confidence, predictions) in answers.items():
+            results[row] = ChatResult(intent_id, self.intents[intent_id], model, confidence, predictions, seconds)
+            if self.response_cache is not None:
+                self.response_cache.put((messages[row], cache_key), results[row])
+        if metrics is not None and answers:
+            metrics.record('result', lap)
+        return results
+
+    def respond_batch(self, messages, models=DEFAULT_MODELS):
+        # A ChatResult per message, answered by the first of models and carrying every model's prediction
+        models = tuple(models)
+
+        def decide(X):
+            predictions = self.predict_vector(X, models, return_scores=True)
+            predictions = {name: (intents.tolist(), scores.tolist()) for name, (intents, scores) in predictions.items()}
+            answers = []
+            for i in range(X.shape[0]):
+                scored = tuple((name, predictions[name][0][i], predictions[name][1][i]) for name in models)
+                answers.append((models[0], scored[0][1], scored[0][2], scored))
+            return answers
+
+        return self._answer_batch(messages, models, decide)
+
+    def respond_cascade_batch(self, messages, margin=DEFAULT_CASCADE_MARGIN, fallback=DEFAULT_CASCADE_FALLBACK):
+        # One answer per message instead of one per model: the linear model runs first and its answer
+        # stands when its margin clears the threshold, only the remaining messages reach the fallback
+        # model ('knn' or 'rf'). The ChatResults name the model that decided and its confidence
+        # (SVM margin, forest probability or cosine similarity)
+        def decide(X):
+            metrics = self.metrics
+            if metrics is not None:
+                start = time.perf_counter()
+            intents, margins = self.svm_model.predict_with_margin(X)
+            if metrics is not None:
+                metrics.record('predict_svm', start)
+            decided = [('svm', intent_id, confidence) for intent_id, confidence in zip(intents.tolist(), margins.tolist())]
+            unsure = np.flatnonzero(margins < margin)
+            if len(unsure):
+                fallback_intents, scores = self.predict_vector(X[unsure], (fallback,), return_scores=True)[fallback]
+                for i, intent_id, score in zip(unsure, fallback_intents.tolist(), scores.tolist()):
+                    decided[i] = (fallback, intent_id, score)
+            self.cascade_skips += len(decided) - len(unsure)
+            self.cascade_fallbacks += len(unsure)
+            return [(model, intent_id, confidence, ((model, intent_id, confidence),))
+                    for model, intent_id, confidence in decided]
+
+        return self._answer_batch(messages, ('cascade', fallback, margin), decide)
+
+    def respond_cascade(self, message, margin=DEFAULT_CASCADE_MARGIN, fallback=DEFAULT_CASCADE_FALLBACK):
+        return self.respond_cascade_batch([message], margin, fallback)[0]
+
+    def respond(self, message, models=DEFAULT_MODELS):
+        # Vectorize the message once and use every requested model to predict the response
+        return self.respond_batch([message], models)[0]
+
+    def respond_many(self, messages, batch_size=DEFAULT_BATCH_SIZE, models=DEFAULT_MODELS):
+        # Answer any iterable of messages, vectorizing and predicting one sparse matrix per batch
+        messages = iter(messages)
+        while True:
+            batch = list(islice(messages, batch_size))
+            if not batch:
+                return
+            yield from self.respond_batch(batch, models)
+
+
+def resample_demo_dataset():
+    # Generate a synthetic imbalanced dataset for illustration and balance it with over- and undersampling.
+    # Kept as an example only, the chatbot itself does not use it
+    from imblearn.over_sampling import RandomOverSampler
+    from imblearn.under_sampling import RandomUnderSampler
+    from sklearn.datasets import make_classification
+    from sklearn.model_selection import train_test_split
+
+    X, y = make_classification(n_classes=2, class_sep=2, weights=[0.1, 0.9],
+                               n_informative=3, n_redundant=1, flip_y=0,
+                               n_features=20, n_clusters_per_class=1,
+                               n_samples=1000, random_state=42)
+
+    # Split the dataset into training and testing sets
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    # Apply oversampling to the training set
+    oversampler = RandomOverSampler(sampling_strategy='minority', random_state=42)
+    X_train_resampled, y_train_resampled = oversampler.fit_resample(X_train, y_train)
+
+    # Apply undersampling to the training set
+    undersampler = RandomUnderSampler(sampling_strategy='majority', random_state=42)
+    X_train_resampled, y_train_resampled = undersampler.fit_resample(X_train, y_train)
+    return X_train_resampled, y_train_resampled
+
+
+def stream_text(text, words_per_chunk=1):
+    # Yield the text a few words at a time, whitespace included, so the chunks join back to the text
+    words = re.findall(r'\s*\S+\s*', text) or [text]
+    for start in range(0, len(words), words_per_chunk):
+        yield ''.join(words[start:start + words_per_chunk])
+
+
+def render_stream(chunks, delay=WORD_DELAY, file=None):
+    # Print chunks as they come, pausing delay seconds after each one; pacing is up to the caller
+    # and nothing here touches the bot
+    file = file or sys.stdout
+    for chunk in chunks:
+        print(chunk, end='', file=file, flush=True)
+        if delay:
+            time.sleep(delay)
+    print(file=file)
+
+
+def print_with_delay(text, delay=WORD_DELAY):
+    render_stream(stream_text(text), delay)
 
 def print_welcome_message():
     print(" ")
@@ -971,24 +1477,41 @@ def ask_question(question):
     timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
     print(f"[{timestamp}] You: {question}")
 
-# Call the function to print the welcome message
-print_welcome_message()
 
-while True:
-    user_input = input('You: ')
+def main():
+    from concurrent.futures import ThreadPoolExecutor
 
-    # Add timestamp for user input
-    timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
-    print(f"[{timestamp}] You: {user_input}")
+    banking_chatbot = BankingChatbot()
+    # The bot only ever runs on this thread, the main thread just reads input and renders output
+    compute = ThreadPoolExecutor(max_workers=1, thread_name_prefix='chatbot')
+    try:
+        # Load the saved models (training them only when the bundle is missing or stale)
+        # while the welcome message is printed
+        loading = compute.submit(banking_chatbot.load_or_train, DATASET_PATH)
+        print_welcome_message()
+        loading.result()
 
-    # Check if the user wants to quit
-    if user_input.lower() in ['quit', 'exit', 'q']:
-        print('Bot: Exiting the chatbot. Goodbye!')
-        break
+        while True:
+            user_input = input('You: ')
 
-    # Get the chatbot's response
-    response = banking_chatbot.respond(user_input)
+            # Add timestamp for user input
+            ask_question(user_input)
 
-    # Add timestamp for bot response
-    timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
-    print(f"[{timestamp}] Bot: {response}")
+            # Check if the user wants to quit
+            if user_input.lower() in ['quit', 'exit', 'q']:
+                print('Bot: Exiting the chatbot. Goodbye!')
+                break
+
+            # Get the chatbot's response
+            response = banking_chatbot.render(compute.submit(banking_chatbot.respond, user_input).result())
+
+            # Add timestamp for bot response and stream the reply word by word
+            timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
+            print(f"[{timestamp}] Bot: ", end='')
+            render_stream(stream_text(response))
+    finally:
+        compute.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,6 @@
+# Banking FAQ queries and responses used to train the chatbot. They live one JSON object per line in
+# data/banking_faq.jsonl; train from chatbot.DATASET_PATH to stream the file instead of loading this list
+from chatbot import DATASET_PATH, read_dataset
+
+
+dataset = list(read_dataset(DATASET_PATH))
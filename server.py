@@ -0,0 +1,533 @@
+# Asyncio HTTP front-end for BankingChatbot.
+# Concurrent chat requests are collected into micro-batches so each batch costs a single
+# vectorize and predict call, instead of one per request.
+import argparse
+import asyncio
+import gc
+import json
+import mmap
+import os
+import signal
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from chatbot import DATASET_PATH, MODEL_BUNDLE_PATH, MODEL_LABELS, BankingChatbot, StageMetrics
+from sessions import DEFAULT_IDLE_TIMEOUT, DEFAULT_MAX_BYTES, ConversationManager, SessionStore
+
+
+# Wait at most this long for more requests to join a batch
+DEFAULT_MAX_DELAY = 0.005
+DEFAULT_MAX_BATCH = 64
+# How often to check the model bundle for a newer version, in seconds
+DEFAULT_RELOAD_INTERVAL = 2.0
+
+HTTP_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+
+def chat_replies(bot, messages):
+    # /chat payloads with every model's answer rendered as text
+    return [{'response': bot.render(result)} for result in bot.respond_batch(messages)]
+
+
+def result_payload(result):
+    # A ChatResult as a /chat payload: its as_dict() fields, with the answer under "response"
+    payload = result.as_dict()
+    payload['response'] = payload.pop('answer')
+    return payload
+
+
+def cascade_replies(bot, messages):
+    # /chat payloads with the single answer the cascade settled on
+    return [result_payload(result) for result in bot.respond_cascade_batch(messages)]
+
+
+def session_replies(conversations):
+    # Handler answering (session ID, message) turns; clarify is set when the session is waiting
+    # for more detail before trusting the answer
+    def replies(bot, turns):
+        return [dict(result_payload(result), clarify=clarify) for result, clarify in conversations.reply_batch(bot, turns)]
+    return replies
+
+
+class MicroBatcher:
+    # handler(bot, messages) answers a batch with one JSON payload per message
+    def __init__(self, bot, max_batch=DEFAULT_MAX_BATCH, max_delay=DEFAULT_MAX_DELAY, handler=chat_replies):
+        self.bot = bot
+        self.handler = handler
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.batches = 0
+        self.requests = 0
+        self._queue = None
+        self._worker = None
+        # The bot keeps counters and a cache, so every batch runs on the same thread
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='chatbot-predict')
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        self._executor.shutdown(wait=True)
+
+    async def submit(self, message):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((message, future))
+        return await future
+
+    async def _collect(self):
+        # Block for the first request, then gather more until the batch is full or the delay runs out
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            messages = [message for message, _ in batch]
+            try:
+                # Passing the bot pins the current model, so a reload swapping self.bot mid-batch only
+                # affects the batches that start after it. Replies are rendered by the same model too
+                replies = await loop.run_in_executor(self._executor, self.handler, self.bot, messages)
+            except Exception as error:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+            self.batches += 1
+            self.requests += len(batch)
+            for (_, future), reply in zip(batch, replies):
+                # The client may have gone away while the batch was running
+                if not future.done():
+                    future.set_result(reply)
+
+
+class ModelReloader:
+    # Watches a saved model bundle and swaps a freshly loaded bot into the batcher when it changes.
+    # Loading and warming up run on their own thread, so batches keep being answered by the old
+    # model until the new one is ready; the swap itself is a single reference assignment
+    def __init__(self, batcher, path=MODEL_BUNDLE_PATH, interval=DEFAULT_RELOAD_INTERVAL):
+        self.batcher = batcher
+        self.path = path
+        self.interval = interval
+        self.reloads = 0
+        self.failures = 0
+        self.last_reload_seconds = None
+        self._signature = None
+        self._task = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='chatbot-reload')
+
+    def bundle_signature(self):
+        # save_model renames a complete bundle into place, so its manifest changes inode and mtime
+        try:
+            stat = os.stat(os.path.join(self.path, 'manifest.json'))
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def start(self):
+        self._signature = self.bundle_signature()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._executor.shutdown(wait=True)
+
+    def stats(self):
+        return {'dataset_hash': self.batcher.bot.dataset_hash, 'reloads': self.reloads,
+                'reload_failures': self.failures, 'last_reload_seconds': self.last_reload_seconds}
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            signature = self.bundle_signature()
+            if signature is not None and signature != self._signature:
+                self._signature = signature
+                await self.reload()
+
+    async def reload(self):
+        # Returns True once the new model is serving
+        start = time.perf_counter()
+        bot = await asyncio.get_running_loop().run_in_executor(self._executor, self._load)
+        if bot is None:
+            self.failures += 1
+            return False
+        # Take over the serving bot's metrics only now, so the warm-up never records into them
+        bot.metrics = self.batcher.bot.metrics
+        self.batcher.bot = bot
+        self.reloads += 1
+        self.last_reload_seconds = time.perf_counter() - start
+        return True
+
+    def _load(self):
+        # The new bot keeps the cache settings of the old one. It is loaded and warmed up without
+        # metrics, while the old bot may still be recording into its own on the batcher thread
+        cache = self.batcher.bot.response_cache
+        if cache is None:
+            bot = BankingChatbot()
+        else:
+            bot = BankingChatbot(cache_size=cache.max_size, cache_ttl=cache.ttl)
+        if not bot.load_model(self.path):
+            return None
+        warm_up(bot)
+        return bot
+
+
+class ChatServer:
+    # Minimal HTTP/1.1 server with keep-alive:
+    #   POST /chat    {"message": "..."} -> {"response": "..."}, in cascade mode
+    #                 ChatResult.as_dict() with the answer as "response"
+    #                 with sessions, {"message": "...", "session": "..."} -> the cascade payload plus "clarify"
+    #   GET  /health  -> {"status": "ok", "batches": ..., "requests": ..., "model": {...}}
+    #   GET  /metrics -> counters and, when the bot has metrics enabled, stage latency histograms
+    #                    in the Prometheus text format
+    def __init__(self, bot, host='127.0.0.1', port=8080, max_batch=DEFAULT_MAX_BATCH, max_delay=DEFAULT_MAX_DELAY,
+                 sock=None, model_path=None, reload_interval=DEFAULT_RELOAD_INTERVAL, cascade=False,
+                 conversations=None):
+        self.host = host
+        self.port = port
+        # Pre-forked workers all accept on the listening socket inherited from the parent
+        self.sock = sock
+        # Cascade mode answers with the single most trusted model instead of every model's answer
+        self.cascade = cascade
+        # A ConversationManager keeps per-session state; requests then go through its cascade
+        self.conversations = conversations
+        if conversations is not None:
+            handler = session_replies(conversations)
+        else:
+            handler = cascade_replies if cascade else chat_replies
+        self.batcher = MicroBatcher(bot, max_batch, max_delay, handler)
+        # Hot reload is on when a bundle path is given
+        self.reloader = None
+        if model_path is not None and reload_interval > 0:
+            self.reloader = ModelReloader(self.batcher, model_path, reload_interval)
+        self._server = None
+
+    async def start(self):
+        self.batcher.start()
+        if self.reloader is not None:
+            self.reloader.start()
+        if self.sock is not None:
+            self._server = await asyncio.start_server(self._handle_connection, sock=self.sock)
+        else:
+            self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        # Port 0 asks the OS for a free port, report the one actually bound
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self.reloader is not None:
+            await self.reloader.stop()
+        await self.batcher.stop()
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await read_http_message(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                status, payload = await self._dispatch(method, path, body)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                await write_http_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, path, body):
+        if path == '/health':
+            health = {'status': 'ok', 'batches': self.batcher.batches, 'requests': self.batcher.requests}
+            if self.reloader is not None:
+                health['model'] = self.reloader.stats()
+            if self.conversations is not None:
+                health['sessions'] = self.conversations.store.stats()
+            return 200, health
+        if path == '/metrics':
+            return 200, self.metrics_text()
+        if path != '/chat':
+            return 404, {'error': 'not found'}
+        if method != 'POST':
+            return 405, {'error': 'use POST'}
+        try:
+            request = json.loads(body)
+            message = request['message']
+        except (ValueError, KeyError, TypeError):
+            return 400, {'error': 'expected a JSON body with a "message" field'}
+        if not isinstance(message, str):
+            return 400, {'error': '"message" must be a string'}
+        if self.conversations is not None:
+            session_id = request.get('session')
+            if session_id is not None and not isinstance(session_id, str):
+                return 400, {'error': '"session" must be a string'}
+            message = (session_id, message)
+        try:
+            return 200, await self.batcher.submit(message)
+        except Exception:
+            return 500, {'error': 'prediction failed'}
+
+    def metrics_text(self):
+        lines = ['# TYPE chatbot_requests_total counter', f'chatbot_requests_total {self.batcher.requests}',
+                 '# TYPE chatbot_batches_total counter', f'chatbot_batches_total {self.batcher.batches}']
+        if self.reloader is not None:
+            lines += ['# TYPE chatbot_model_reloads_total counter', f'chatbot_model_reloads_total {self.reloader.reloads}',
+                      '# TYPE chatbot_model_reload_failures_total counter',
+                      f'chatbot_model_reload_failures_total {self.reloader.failures}']
+            if self.reloader.last_reload_seconds is not None:
+                lines += ['# TYPE chatbot_model_reload_seconds gauge',
+                          f'chatbot_model_reload_seconds {self.reloader.last_reload_seconds!r}']
+        if self.conversations is not None:
+            stats = self.conversations.store.stats()
+            lines += ['# TYPE chatbot_sessions gauge', f'chatbot_sessions {stats["sessions"]}',
+                      '# TYPE chatbot_session_evictions_total counter',
+                      f'chatbot_session_evictions_total {stats["evictions"]}',
+                      '# TYPE chatbot_session_expirations_total counter',
+                      f'chatbot_session_expirations_total {stats["expirations"]}']
+            if stats['bytes'] is not None:
+                lines += ['# TYPE chatbot_session_bytes gauge', f'chatbot_session_bytes {stats["bytes"]}']
+        if self.cascade or self.conversations is not None:
+            bot = self.batcher.bot
+            lines += ['# TYPE chatbot_cascade_skips_total counter', f'chatbot_cascade_skips_total {bot.cascade_skips}',
+                      '# TYPE chatbot_cascade_fallbacks_total counter',
+                      f'chatbot_cascade_fallbacks_total {bot.cascade_fallbacks}']
+        text = '\n'.join(lines) + '\n'
+        metrics = self.batcher.bot.metrics
+        if metrics is not None:
+            text += metrics.prometheus()
+        return text
+
+
+async def read_http_message(reader):
+    # Returns (start line word 1, word 2, headers, body) or None once the peer closes the connection
+    start_line = await reader.readline()
+    if not start_line:
+        return None
+    first, second = start_line.decode('latin-1').split()[:2]
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers.get('content-length', 0)))
+    return first, second, headers, body
+
+
+async def write_http_response(writer, status, payload, keep_alive=True):
+    # Strings are sent as plain text, anything else as JSON
+    if isinstance(payload, str):
+        body, content_type = payload.encode('utf-8'), 'text/plain; version=0.0.4'
+    else:
+        body, content_type = json.dumps(payload).encode('utf-8'), 'application/json'
+    head = (f'HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n'
+            f'Content-Type: {content_type}\r\n'
+            f'Content-Length: {len(body)}\r\n'
+            f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n')
+    writer.write(head.encode('latin-1') + body)
+    await writer.drain()
+
+
+class ChatClient:
+    # Local keep-alive client for the chat server, used for testing and load generation offline
+    def __init__(self, host='127.0.0.1', port=8080):
+        self.host = host
+        self.port = port
+        self._reader = None
+        self._writer = None
+
+    async def connect(self):
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            await self._writer.wait_closed()
+            self._writer = None
+
+    async def request(self, method, path, payload=None):
+        # Returns (status, decoded JSON body, or the text of a plain-text response)
+        if self._writer is None:
+            await self.connect()
+        body = b'' if payload is None else json.dumps(payload).encode('utf-8')
+        head = (f'{method} {path} HTTP/1.1\r\n'
+                f'Host: {self.host}:{self.port}\r\n'
+                f'Content-Type: application/json\r\n'
+                f'Content-Length: {len(body)}\r\n\r\n')
+        self._writer.write(head.encode('latin-1') + body)
+        await self._writer.drain()
+        response = await read_http_message(self._reader)
+        if response is None:
+            raise ConnectionError('server closed the connection')
+        _, status, headers, response_body = response
+        if headers.get('content-type', '').startswith('text/plain'):
+            return int(status), response_body.decode('utf-8')
+        return int(status), json.loads(response_body)
+
+    async def chat(self, message):
+        status, payload = await self.request('POST', '/chat', {'message': message})
+        if status != 200:
+            raise RuntimeError(f'chat request failed with {status}: {payload}')
+        return payload['response']
+
+
+def warm_up(bot):
+    # Run one prediction through every model so lazy imports and lookup tables are built up front
+    bot.respond_batch(['warm up'], models=tuple(MODEL_LABELS))
+
+
+def share_model_arrays(bot):
+    # Move the model's numpy arrays into one anonymous shared mapping. Forked workers then read
+    # the same physical pages, which copy-on-write would otherwise duplicate as soon as they are touched.
+    # Arrays memory-mapped from a saved bundle already live in the shared page cache and are kept as is
+    arrays = bot.model_arrays()
+    private = {name: array for name, array in arrays.items() if not isinstance(array, np.memmap)}
+    # Keep every array 64-byte aligned inside the mapping
+    layout = {}
+    size = 0
+    for name, array in private.items():
+        layout[name] = size
+        size += (array.nbytes + 63) // 64 * 64
+    shared = mmap.mmap(-1, max(size, 1))
+
+    for name, array in private.items():
+        view = np.ndarray(array.shape, dtype=array.dtype, buffer=shared, offset=layout[name])
+        view[...] = array
+        view.flags.writeable = False
+        arrays[name] = view
+    bot.bind_model_arrays(arrays)
+    return shared
+
+
+def serve_prefork(bot, host='127.0.0.1', port=8080, workers=4, max_batch=DEFAULT_MAX_BATCH,
+                  max_delay=DEFAULT_MAX_DELAY, model_path=None, reload_interval=DEFAULT_RELOAD_INTERVAL, cascade=False):
+    # Load once in the parent, then fork workers that share the model memory and the listening socket
+    sock = socket.create_server((host, port), reuse_port=False, backlog=1024)
+    sock.setblocking(False)
+    share_model_arrays(bot)
+    warm_up(bot)
+
+    # Move everything allocated so far out of the garbage collector's reach, so collections in the
+    # workers never write to (and so privately copy) the pages holding the model objects
+    gc.collect()
+    gc.freeze()
+
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            # Each worker watches the bundle itself; reloaded arrays are memory-mapped, so the
+            # workers still share them through the page cache
+            server = ChatServer(bot, max_batch=max_batch, max_delay=max_delay, sock=sock, model_path=model_path,
+                                reload_interval=reload_interval, cascade=cascade)
+            try:
+                asyncio.run(server.serve_forever())
+            finally:
+                os._exit(0)
+        children.append(pid)
+
+    def stop_children(signum, frame):
+        for child in children:
+            try:
+                os.kill(child, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop_children)
+    signal.signal(signal.SIGTERM, stop_children)
+    for child in children:
+        while True:
+            try:
+                os.waitpid(child, 0)
+                break
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+    sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the banking chatbot over HTTP')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--max-batch', type=int, default=DEFAULT_MAX_BATCH)
+    parser.add_argument('--max-delay-ms', type=float, default=DEFAULT_MAX_DELAY * 1000)
+    parser.add_argument('--workers', type=int, default=1,
+                        help='number of pre-forked worker processes sharing one copy of the model')
+    parser.add_argument('--dataset', default=DATASET_PATH, help='JSONL or CSV file to train on when no bundle matches')
+    parser.add_argument('--model-path', default=MODEL_BUNDLE_PATH)
+    parser.add_argument('--reload-interval', type=float, default=DEFAULT_RELOAD_INTERVAL,
+                        help='seconds between checks for a newer model bundle, 0 disables hot reload')
+    parser.add_argument('--metrics', action='store_true', help='record per-stage latency histograms for /metrics')
+    parser.add_argument('--cascade', action='store_true',
+                        help='answer with the SVM alone when it is confident, falling back to nearest neighbours')
+    parser.add_argument('--sessions', action='store_true',
+                        help='keep per-session conversation state for requests carrying a "session" field')
+    parser.add_argument('--session-timeout', type=float, default=DEFAULT_IDLE_TIMEOUT,
+                        help='seconds after which an idle session is dropped')
+    parser.add_argument('--session-memory-mb', type=float, default=DEFAULT_MAX_BYTES / 2 ** 20,
+                        help='memory cap for session records, least recently used sessions are evicted past it')
+    args = parser.parse_args()
+    if args.sessions and args.workers > 1:
+        # Session state lives in the worker process, and pre-forked workers share one listening socket
+        parser.error('--sessions needs a single worker')
+
+    bot = BankingChatbot(metrics=StageMetrics() if args.metrics else None)
+    bot.load_or_train(args.dataset, args.model_path)
+    print(f'Serving the banking chatbot on http://{args.host}:{args.port}/chat', flush=True)
+    if args.workers > 1:
+        serve_prefork(bot, args.host, args.port, args.workers, args.max_batch, args.max_delay_ms / 1000,
+                      args.model_path, args.reload_interval, args.cascade)
+    else:
+        conversations = None
+        if args.sessions:
+            conversations = ConversationManager(SessionStore(idle_timeout=args.session_timeout,
+                                                             max_bytes=int(args.session_memory_mb * 2 ** 20)))
+        server = ChatServer(bot, args.host, args.port, args.max_batch, args.max_delay_ms / 1000,
+                            model_path=args.model_path, reload_interval=args.reload_interval, cascade=args.cascade,
+                            conversations=conversations)
+        asyncio.run(server.serve_forever())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+# Per-user conversation state for serving many chat sessions at once.
+# Sessions are kept as small packed records in a pluggable mapping backend: an in-memory OrderedDict
+# by default (O(1) lookups, idle and size based eviction from its least recently used end), or any
+# dict-like store of bytes such as dbm/shelve for a local on-disk store.
+import dbm
+import struct
+import sys
+import time
+from collections import OrderedDict
+
+from chatbot import DEFAULT_CASCADE_FALLBACK, DEFAULT_CASCADE_MARGIN
+
+
+# Sessions untouched for this many seconds are dropped
+DEFAULT_IDLE_TIMEOUT = 30 * 60
+# Upper bound on the memory held by in-memory session records
+DEFAULT_MAX_BYTES = 64 * 2 ** 20
+# Fallback answers less confident than this ask the user to clarify
+DEFAULT_CLARIFY_BELOW = 0.3
+# A pending clarification keeps at most this many characters of the earlier messages
+MAX_PENDING_CHARS = 500
+# Rough per-entry cost of an OrderedDict slot and its links, on top of the key and record objects
+ENTRY_OVERHEAD = 100
+
+
+class Session:
+    # One conversation's state: the last intent answered (-1 before any), the message awaiting a
+    # clarification (empty when none), the number of turns and when it was last used
+    __slots__ = ('session_id', 'last_intent', 'pending', 'turns', 'last_seen')
+
+    RECORD = struct.Struct('<idI')
+
+    def __init__(self, session_id, last_intent=-1, pending='', turns=0, last_seen=0.0):
+        self.session_id = session_id
+        self.last_intent = last_intent
+        self.pending = pending
+        self.turns = turns
+        self.last_seen = last_seen
+
+    def __repr__(self):
+        return (f'Session({self.session_id!r}, last_intent={self.last_intent}, pending={self.pending!r}, '
+                f'turns={self.turns})')
+
+    def to_bytes(self):
+        return self.RECORD.pack(self.last_intent, self.last_seen, self.turns) + self.pending.encode('utf-8')
+
+    @classmethod
+    def from_bytes(cls, session_id, record):
+        last_intent, last_seen, turns = cls.RECORD.unpack_from(record)
+        return cls(session_id, last_intent, bytes(record[cls.RECORD.size:]).decode('utf-8'), turns, last_seen)
+
+
+def open_dbm_backend(path):
+    # A local on-disk backend, e.g. for tests or a single-host deployment
+    return dbm.open(path, 'c')
+
+
+class SessionStore:
+    # backend maps session IDs to packed records. With the default OrderedDict, entries are kept in
+    # least recently used order, so idle sessions and the ones over max_bytes are evicted from the
+    # front in O(1) each. Other backends are not memory-bound; their idle sessions are dropped when
+    # read or by expire(), which scans them
+    def __init__(self, backend=None, idle_timeout=DEFAULT_IDLE_TIMEOUT, max_bytes=DEFAULT_MAX_BYTES,
+                 clock=time.time):
+        self.backend = OrderedDict() if backend is None else backend
+        self.idle_timeout = idle_timeout
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.ordered = isinstance(self.backend, OrderedDict)
+        self.bytes = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, session_id):
+        # The session, or None when it does not exist or has been idle too long
+        record = self.backend.get(session_id)
+        if record is None:
+            return None
+        session = Session.from_bytes(session_id, record)
+        if self.clock() - session.last_seen >= self.idle_timeout:
+            self._remove(session_id, record)
+            self.expirations += 1
+            return None
+        if self.ordered:
+            self.backend.move_to_end(session_id)
+        return session
+
+    def put(self, session):
+        session.last_seen = self.clock()
+        record = session.to_bytes()
+        if not self.ordered:
+            self.backend[session.session_id] = record
+            return
+        previous = self.backend.get(session.session_id)
+        if previous is not None:
+            self.bytes -= entry_size(session.session_id, previous)
+        self.backend[session.session_id] = record
+        self.backend.move_to_end(session.session_id)
+        self.bytes += entry_size(session.session_id, record)
+        self._expire_front()
+        while self.bytes > self.max_bytes and len(self.backend) > 1:
+            self._remove(*self.backend.popitem(last=False), popped=True)
+            self.evictions += 1
+
+    def delete(self, session_id):
+        record = self.backend.get(session_id)
+        if record is not None:
+            self._remove(session_id, record)
+
+    def expire(self):
+        # Drop every idle session and return how many there were
+        if self.ordered:
+            return self._expire_front()
+        now = self.clock()
+        idle = [key for key in self.backend.keys()
+                if now - Session.from_bytes(key, self.backend[key]).last_seen >= self.idle_timeout]
+        for key in idle:
+            del self.backend[key]
+        self.expirations += len(idle)
+        return len(idle)
+
+    def close(self):
+        if hasattr(self.backend, 'close'):
+            self.backend.close()
+
+    def __len__(self):
+        return len(self.backend)
+
+    def stats(self):
+        return {'sessions': len(self.backend), 'bytes': self.bytes if self.ordered else None,
+                'max_bytes': self.max_bytes, 'evictions': self.evictions, 'expirations': self.expirations}
+
+    def _expire_front(self):
+        # Least recently used first, so the idle sessions are all at the front
+        now = self.clock()
+        expired = 0
+        while self.backend:
+            session_id, record = next(iter(self.backend.items()))
+            if now - Session.from_bytes(session_id, record).last_seen < self.idle_timeout:
+                break
+            self._remove(session_id, record)
+            expired += 1
+        self.expirations += expired
+        return expired
+
+    def _remove(self, session_id, record, popped=False):
+        if not popped:
+            del self.backend[session_id]
+        if self.ordered:
+            self.bytes -= entry_size(session_id, record)
+
+
+def entry_size(session_id, record):
+    return sys.getsizeof(session_id) + sys.getsizeof(record) + ENTRY_OVERHEAD
+
+
+class ConversationManager:
+    # Answers turns from many sessions through the bot's cascade. When the answer comes from the
+    # fallback model with low confidence, the session remembers the message and asks for more
+    # detail; the next message of that session is answered together with it
+    def __init__(self, store=None, margin=DEFAULT_CASCADE_MARGIN, fallback=DEFAULT_CASCADE_FALLBACK,
+                 clarify_below=DEFAULT_CLARIFY_BELOW):
+        self.store = SessionStore() if store is None else store
+        self.margin = margin
+        self.fallback = fallback
+        self.clarify_below = clarify_below
+
+    def reply_batch(self, bot, turns):
+        # turns holds (session ID, message) pairs, a None session ID keeps no state. Returns
+        # (ChatResult, whether a clarification is needed) per turn. The bot is passed in so a server
+        # can swap models between batches
+        sessions = {}
+        for session_id, _ in turns:
+            if session_id is not None and session_id not in sessions:
+                sessions[session_id] = self.store.get(session_id) or Session(session_id)
+
+        # A session's turns are answered in order: the k-th turn of every session goes in the k-th
+        # batch call, so it sees what the earlier turns left pending. Usually there is only one call
+        waves = []
+        seen = {}
+        for index, (session_id, _) in enumerate(turns):
+            wave = seen.get(session_id, 0) if session_id is not None else 0
+            if session_id is not None:
+                seen[session_id] = wave + 1
+            if wave == len(waves):
+                waves.append([])
+            waves[wave].append(index)
+
+        replies = [None] * len(turns)
+        for wave in waves:
+            queries = []
+            for index in wave:
+                session_id, message = turns[index]
+                session = sessions.get(session_id)
+                if session is not None and session.pending:
+                    message = f'{session.pending} {message}'
+                queries.append(message)
+            results = bot.respond_cascade_batch(queries, self.margin, self.fallback)
+            for index, query, result in zip(wave, queries, results):
+                clarify = result.model == self.fallback and result.confidence < self.clarify_below
+                session = sessions.get(turns[index][0])
+                if session is not None:
+                    session.turns += 1
+                    if clarify:
+                        session.pending = query[-MAX_PENDING_CHARS:]
+                    else:
+                        session.pending = ''
+                        session.last_intent = result.intent_id
+                replies[index] = (result, clarify)
+
+        for session in sessions.values():
+            self.store.put(session)
+        return replies
+
+    def reply(self, bot, session_id, message):
+        return self.reply_batch(bot, [(session_id, message)])[0]
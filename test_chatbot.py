@@ -0,0 +1,277 @@
+import csv
+import json
+
+import numpy as np
+import pytest
+from scipy.sparse import csr_matrix
+
+from chatbot import (DATASET_PATH, BankingChatbot, ChatResult, FlatForest, LinearIntentModel, MappedTfidfVectorizer,
+                     StringTable, dataset_hash, ingest_dataset, read_dataset, sorted_order)
+
+
+@pytest.fixture(scope='module')
+def corpus():
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    queries, responses = zip(*read_dataset(DATASET_PATH))
+    _, labels = np.unique(responses, return_inverse=True)
+    return TfidfVectorizer().fit_transform(queries), labels
+
+
+@pytest.fixture(scope='module')
+def dataset():
+    return list(ingest_dataset(DATASET_PATH))
+
+
+def trained_bot(dataset, **options):
+    bot = BankingChatbot(**options)
+    bot.train_ml_models(dataset, n_jobs=1)
+    return bot
+
+
+def fit_forest(X, labels, n_estimators=10, random_state=0):
+    from sklearn.ensemble import RandomForestClassifier
+
+    return RandomForestClassifier(n_estimators=n_estimators, random_state=random_state).fit(X, labels)
+
+
+def test_flat_forest_matches_sklearn(corpus):
+    X, labels = corpus
+    forest = fit_forest(X, labels)
+    flat = FlatForest.from_estimator(forest)
+    assert np.array_equal(flat.predict_proba(X), forest.predict_proba(X))
+    assert np.array_equal(flat.predict_proba(X[:1]), forest.predict_proba(X[:1]))
+    assert np.array_equal(flat.predict(X), forest.predict(X))
+
+
+def test_flat_forest_on_a_subset_of_features(corpus):
+    X, labels = corpus
+    features = np.arange(0, X.shape[1], 2)
+    forest = fit_forest(X[:, features], labels)
+    flat = FlatForest.from_estimator(forest, features, X.shape[1])
+    assert np.array_equal(flat.predict_proba(X), forest.predict_proba(X[:, features]))
+
+
+def test_combined_forest_votes_with_every_tree(corpus):
+    X, labels = corpus
+    first, second = fit_forest(X, labels, 6, 1), fit_forest(X, labels, 4, 2)
+    combined = FlatForest.combine([FlatForest.from_estimator(first), FlatForest.from_estimator(second)], X.shape[1])
+
+    merged = fit_forest(X, labels, 6, 1)
+    merged.estimators_ = first.estimators_ + second.estimators_
+    merged.n_estimators = len(merged.estimators_)
+    assert np.array_equal(combined.predict_proba(X), merged.predict_proba(X))
+
+
+
+
+def test_string_table_search():
+    table = StringTable.pack(['card', 'loan', 'zebra', 'account', 'émigré'])
+    order = sorted_order(['card', 'loan', 'zebra', 'account', 'émigré'])
+    assert [table.search(key, order) for key in ('account', 'card', 'émigré', 'zebra', 'loan')] == [3, 0, 4, 2, 1]
+    assert table.search('cards', order) == -1
+    assert table.search('') == -1
+    assert StringTable.pack(['a', 'b']).search('b') == 1
+    assert sorted_order(['a', 'b']) is None
+
+
+def test_mapped_vectorizer_matches_sklearn():
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    queries = [query for query, _ in read_dataset(DATASET_PATH)]
+    vectorizer = TfidfVectorizer().fit(queries)
+    mapped = MappedTfidfVectorizer(StringTable.pack(vectorizer.get_feature_names_out()), vectorizer.idf_)
+    messages = queries[:50] + ['an unseen zorp word', '']
+    expected = vectorizer.transform(messages)
+    X = mapped.transform(messages)
+    assert np.array_equal(X.indptr, expected.indptr)
+    assert np.array_equal(X.indices, expected.indices)
+    assert np.array_equal(X.data, expected.data)
+
+
+
+def test_cached_replies_accept_models_as_a_list():
+    bot = BankingChatbot(cache_size=8)
+    bot.train_ml_models(DATASET_PATH, n_jobs=1)
+    first = bot.respond_batch(['lost my card'], models=['svm', 'knn'])[0]
+    assert bot.respond_batch(['lost my card'], models=['svm', 'knn'])[0] is first
+    assert bot.response_cache.stats()['hits'] == 1
+
+
+def test_added_examples_are_answered(dataset):
+    bot = trained_bot(dataset)
+    bot.add_examples([('How do I zorp my blorf account?', 'Zorp it at a branch.')])
+    result = bot.respond('how do i zorp my blorf account', models=('svm', 'rf', 'knn'))
+    assert result.model == 'exact'
+    assert result.answer == 'Zorp it at a branch.'
+    X = bot.vectorize(['zorp my blorf account please'])
+    assert bot.intents[bot.predict_vector(X, ('svm',))['svm'][0]] == 'Zorp it at a branch.'
+
+
+def test_adding_an_existing_pair_changes_nothing(dataset):
+    bot = trained_bot(dataset)
+    query, response = dataset[0]
+    size, digest = len(bot.corpus_queries), bot.dataset_hash
+    bot.add_examples([(f'  {query.upper()} ', response)])
+    assert (len(bot.corpus_queries), bot.dataset_hash) == (size, digest)
+
+    pair = ('How do I close my safe deposit box?', 'Visit the branch.')
+    bot.add_examples([pair, pair])
+    assert len(bot.corpus_queries) == size + 1
+    assert bot.dataset_hash == dataset_hash(ingest_dataset(dataset + [pair]))
+
+
+def test_updated_examples_change_every_model_answer(dataset):
+    bot = trained_bot(dataset)
+    queries = [query for query, _ in dataset[:40:2]]
+    bot.update_examples([(query, f'New answer {index}.') for index, query in enumerate(queries)])
+    predictions = bot.predict_vector(bot.vectorize(queries), ('svm', 'rf', 'knn'))
+    for name, intents in predictions.items():
+        assert [bot.intents[intent] for intent in intents] == [f'New answer {index}.' for index in range(len(queries))], name
+
+
+def test_jsonl_and_csv_sources_are_ingested_alike(tmp_path):
+    pairs = [('How do I  open an account?', 'Visit a branch.'), ('how do I open an account', 'Visit a branch.'),
+             ('', 'No query.'), ('Card lost?', ' Call   us. ')]
+    jsonl = tmp_path / 'faq.jsonl'
+    jsonl.write_text('\n'.join(json.dumps({'query': query, 'response': response}) for query, response in pairs) + '\n\n')
+    with open(tmp_path / 'faq.csv', 'w', newline='') as rows:
+        writer = csv.writer(rows)
+        writer.writerow(['query', 'response'])
+        writer.writerows(pairs)
+
+    expected = [('How do I open an account?', 'Visit a branch.'), ('Card lost?', 'Call us.')]
+    assert list(ingest_dataset(jsonl)) == expected
+    assert list(ingest_dataset(str(tmp_path / 'faq.csv'))) == expected
+    assert list(ingest_dataset(iter(pairs))) == expected
+    with pytest.raises(ValueError):
+        list(read_dataset(str(tmp_path / 'faq.txt')))
+
+
+def test_load_or_train_accepts_a_one_shot_iterable(dataset, tmp_path):
+    bot = BankingChatbot()
+    assert bot.load_or_train(iter(dataset), str(tmp_path / 'model'))
+    assert bot.dataset_hash == dataset_hash(dataset)
+    assert not BankingChatbot().load_or_train(iter(dataset), str(tmp_path / 'model'))
+
+
+def test_hashed_mode_ignores_unseen_terms(dataset, tmp_path):
+    vocabulary, hashed = trained_bot(dataset), trained_bot(dataset, hash_features=2 ** 18)
+    messages = ['activate my debit card qwzx plorb frindle', 'lost card']
+    X = hashed.vectorize(messages)
+    assert X.shape[1] == 2 ** 18
+    assert np.allclose(hashed.svm_model.predict_with_margin(X)[1],
+                       vocabulary.svm_model.predict_with_margin(vocabulary.vectorize(messages))[1])
+
+    hashed.save_model(str(tmp_path / 'model'))
+    loaded = BankingChatbot(hash_features=2 ** 18)
+    assert not loaded.load_or_train(DATASET_PATH, str(tmp_path / 'model'))
+    assert [result.intent_id for result in loaded.respond_batch(messages)] == \
+        [result.intent_id for result in hashed.respond_batch(messages)]
+
+
+def test_hashed_update_of_existing_queries(dataset):
+    bot = trained_bot(dataset, hash_features=2 ** 18)
+    query = dataset[0][0]
+    bot.update_examples([(query, 'Call 555.')])
+    assert bot.respond(query).answer == 'Call 555.'
+
+def test_linear_model_matches_the_dense_product(corpus):
+    from sklearn.svm import LinearSVC
+
+    X, labels = corpus
+    estimator = LinearSVC(random_state=42).fit(X, labels)
+    model = LinearIntentModel.from_estimator(estimator)
+    # With a vocabulary every feature keeps its row, so scoring is the plain product
+    assert len(model.weights) == X.shape[1]
+    dense = X @ estimator.coef_.T + estimator.intercept_
+    assert np.array_equal(model.decision_function(X), dense)
+    assert np.array_equal(model.decision_function(X[:1]), dense[:1])
+    assert np.array_equal(model.predict(X), estimator.predict(X))
+
+def test_linear_model_in_a_sparse_feature_space(corpus):
+    # Spread the columns over a much wider space, as hashing does: only the used rows are stored
+    from sklearn.svm import LinearSVC
+
+    X, labels = corpus
+    estimator = LinearSVC(random_state=42).fit(X, labels)
+    n_features = X.shape[1] * 8
+    features = np.arange(X.shape[1]) * 8
+    model = LinearIntentModel.from_coef(estimator.coef_, estimator.intercept_, estimator.classes_, features, n_features)
+    assert len(model.weights) < n_features
+
+    wide = csr_matrix((X.data, features[X.indices], X.indptr), shape=(X.shape[0], n_features))
+    coef = np.zeros((len(estimator.classes_), n_features))
+    coef[:, features] = estimator.coef_
+    dense = wide @ coef.T + estimator.intercept_
+    assert np.array_equal(model.decision_function(wide), dense)
+    assert np.array_equal(model.decision_function(wide[:1]), dense[:1])
+
+def test_chat_result_binary_round_trip():
+    result = ChatResult(12, 'Visit any branch – ✓', 'svm', -0.25, (('svm', 12, -0.25), ('rf', 3, 0.4),
+                                                                   ('knn', 12, 0.75)), 0.002)
+    assert ChatResult.from_bytes(result.to_bytes()) == result
+
+    stripped = ChatResult.from_bytes(result.to_bytes(include_answer=False))
+    assert stripped.answer == ''
+    assert (stripped.intent_id, stripped.predictions) == (result.intent_id, result.predictions)
+
+    exact = ChatResult(5, 'Yes.', 'exact', 1.0)
+    assert ChatResult.from_bytes(exact.to_bytes()) == exact
+
+
+def test_exact_matches_report_no_model_predictions(dataset):
+    bot = trained_bot(dataset)
+    query = dataset[0][0]
+    for result in (bot.respond(query, models=('svm', 'rf', 'knn')), bot.respond_cascade(query)):
+        assert (result.model, result.confidence, result.predictions) == ('exact', 1.0, ())
+        assert bot.render(result) == result.answer
+
+
+def test_load_or_train_retrains_only_on_stale_bundles(dataset, tmp_path):
+    path = str(tmp_path / 'model')
+    assert BankingChatbot().load_or_train(dataset, path)
+    assert not BankingChatbot().load_or_train(dataset, path)
+    # Order does not matter, other data or another bundle version does
+    assert not BankingChatbot().load_or_train(dataset[::-1], path)
+    assert BankingChatbot().load_or_train(dataset[1:], path)
+
+    manifest = tmp_path / 'model' / 'manifest.json'
+    manifest.write_text(manifest.read_text().replace('"version": ', '"version": -'))
+    assert BankingChatbot().load_or_train(dataset[1:], path)
+    assert not BankingChatbot().load_model(str(tmp_path / 'missing'))
+
+
+def test_saved_bundle_answers_like_the_trained_bot(dataset, tmp_path):
+    bot = trained_bot(dataset)
+    bot.add_examples([('How do I zorp my blorf?', 'Zorp it.'), ('aardvark savings', 'Aardvark.')])
+    bot.save_model(str(tmp_path / 'model'))
+    loaded = BankingChatbot()
+    assert loaded.load_model(str(tmp_path / 'model'))
+    assert isinstance(loaded.knn_model.labels, np.memmap)
+    assert loaded.dataset_hash == bot.dataset_hash
+
+    messages = ['how do I zorp my blorf', 'aardvark savings account', dataset[5][0], 'lost my card', '']
+    models = ('svm', 'rf', 'knn')
+    for expected, result in zip(bot.respond_batch(messages, models), loaded.respond_batch(messages, models)):
+        assert (result.intent_id, result.answer, result.model, result.predictions) == \
+            (expected.intent_id, expected.answer, expected.model, expected.predictions)
+    # A loaded bundle can still take examples
+    loaded.add_examples([('what is a zorp fee', 'There is none.')])
+    assert loaded.respond('what is a zorp fee').answer == 'There is none.'
+
+
+def test_cascade_counts_skips_and_fallbacks(dataset):
+    bot = trained_bot(dataset, cache_size=8)
+    messages = [dataset[0][0], 'lost my card', 'blah purple', 'what are the rates on home loans']
+    results = bot.respond_cascade_batch(messages, margin=0.2)
+    margins = bot.svm_model.predict_with_margin(bot.vectorize(messages[1:]))[1]
+
+    assert results[0].model == 'exact'
+    assert [result.model for result in results[1:]] == ['svm' if margin >= 0.2 else 'knn' for margin in margins]
+    assert (bot.cascade_skips, bot.cascade_fallbacks) == (int((margins >= 0.2).sum()), int((margins < 0.2).sum()))
+    assert (bot.exact_hits, bot.exact_misses) == (1, 3)
+    # Cached answers reach neither model
+    assert bot.respond_cascade_batch(messages, margin=0.2) == results
+    assert bot.cascade_skips + bot.cascade_fallbacks == 3
+    assert all(result.model == 'svm' for result in bot.respond_cascade_batch(messages[1:], margin=-np.inf))
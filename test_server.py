@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from chatbot import DATASET_PATH, BankingChatbot, StageMetrics
+from server import ChatClient, ChatServer
+
+
+@pytest.fixture(scope='module')
+def model_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('bundle') / 'model')
+    BankingChatbot().load_or_train(DATASET_PATH, path)
+    return path
+
+
+def loaded_bot(model_path, **options):
+    bot = BankingChatbot(**options)
+    assert bot.load_model(model_path)
+    return bot
+
+
+def test_reload_keeps_metrics_out_of_the_warm_up(model_path):
+    async def run():
+        bot = loaded_bot(model_path, metrics=StageMetrics())
+        server = ChatServer(bot, port=0, model_path=model_path, reload_interval=60)
+        bot.respond('lost my card')
+        before = bot.metrics.snapshot()
+        assert await server.reloader.reload()
+        assert server.batcher.bot is not bot
+        assert server.batcher.bot.metrics is bot.metrics
+        assert bot.metrics.snapshot() == before
+
+    asyncio.run(run())
+
+
+def chat(server, payloads):
+    async def run():
+        await server.start()
+        client = ChatClient(port=server.port)
+        await client.connect()
+        try:
+            return [await client.request('POST', '/chat', payload) for payload in payloads]
+        finally:
+            await client.close()
+            await server.close()
+
+    return asyncio.run(run())
+
+
+def test_cascade_payload_is_the_chat_result(model_path):
+    bot = loaded_bot(model_path)
+    [(status, payload)] = chat(ChatServer(bot, port=0, cascade=True), [{'message': 'lost my card'}])
+    expected = bot.respond_cascade('lost my card').as_dict()
+    assert status == 200
+    assert payload.pop('response') == expected.pop('answer')
+    assert payload.keys() == expected.keys()
+    assert payload['intent_id'] == expected['intent_id']
+
+
+def test_chat_endpoint_answers_like_the_bot(model_path):
+    bot = loaded_bot(model_path)
+    replies = chat(ChatServer(bot, port=0), [{'message': 'lost my card'}, {'text': 'lost my card'}, {'message': 3}])
+    assert replies[0] == (200, {'response': bot.render(bot.respond('lost my card'))})
+    assert [status for status, _ in replies[1:]] == [400, 400]
+
+
+def test_concurrent_requests_share_batches(model_path):
+    async def run():
+        server = ChatServer(loaded_bot(model_path), port=0, max_batch=16, max_delay=0.05)
+        await server.start()
+        clients = [ChatClient(port=server.port) for _ in range(8)]
+        try:
+            for client in clients:
+                await client.connect()
+            replies = await asyncio.gather(*(client.chat(f'lost my card {index}') for index, client in
+                                             enumerate(clients)))
+            health = await clients[0].request('GET', '/health')
+            missing = await clients[0].request('GET', '/missing')
+            wrong_method = await clients[0].request('GET', '/chat')
+        finally:
+            for client in clients:
+                await client.close()
+            await server.close()
+        return replies, health, missing, wrong_method
+
+    replies, (status, health), missing, wrong_method = asyncio.run(run())
+    assert len(replies) == 8 and all(reply.startswith('Responding - ') for reply in replies)
+    assert status == 200
+    assert health['requests'] == 8
+    assert health['batches'] < 8
+    assert (missing[0], wrong_method[0]) == (404, 405)
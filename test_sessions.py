@@ -0,0 +1,93 @@
+from chatbot import ChatResult
+from sessions import ConversationManager, Session, SessionStore, entry_size, open_dbm_backend
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeBot:
+    # Answers through the fallback with low confidence unless the message mentions a card
+    def __init__(self):
+        self.batches = []
+
+    def respond_cascade_batch(self, messages, margin, fallback):
+        self.batches.append(list(messages))
+        return [ChatResult(7, 'answer', 'svm', 1.0) if 'card' in message else ChatResult(3, 'unsure', fallback, 0.0)
+                for message in messages]
+
+
+def test_turns_of_one_session_in_a_batch_are_answered_in_order():
+    bot = FakeBot()
+    manager = ConversationManager(SessionStore())
+    replies = manager.reply_batch(bot, [('s', 'help'), ('t', 'hello'), ('s', 'card lost'), ('s', 'thanks')])
+
+    assert [clarify for _, clarify in replies] == [True, True, False, True]
+    assert bot.batches == [['help', 'hello'], ['help card lost'], ['thanks']]
+    session = manager.store.get('s')
+    assert session.turns == 3
+    assert session.last_intent == 7
+    assert session.pending == 'thanks'
+    assert manager.store.get('t').turns == 1
+
+
+def test_pending_message_joins_the_next_batch():
+    bot = FakeBot()
+    manager = ConversationManager(SessionStore())
+    manager.reply(bot, 's', 'help')
+    result, clarify = manager.reply(bot, 's', 'my card')
+    assert bot.batches[-1] == ['help my card']
+    assert not clarify
+    assert manager.store.get('s').pending == ''
+
+
+def test_turns_without_a_session_keep_no_state():
+    manager = ConversationManager(SessionStore())
+    manager.reply_batch(FakeBot(), [(None, 'help'), (None, 'help')])
+    assert len(manager.store) == 0
+
+def test_store_evicts_least_recently_used_past_the_memory_cap():
+    size = entry_size('user-0', Session('user-0').to_bytes())
+    store = SessionStore(max_bytes=3 * size, clock=Clock())
+    for name in ('user-0', 'user-1', 'user-2'):
+        store.put(Session(name))
+    store.get('user-0')
+    store.put(Session('user-3'))
+
+    assert store.get('user-1') is None
+    assert [store.get(name) is not None for name in ('user-0', 'user-2', 'user-3')] == [True, True, True]
+    assert store.stats()['evictions'] == 1
+    assert store.bytes == 3 * size
+
+def test_store_expires_idle_sessions():
+    clock = Clock()
+    store = SessionStore(idle_timeout=10, clock=clock)
+    store.put(Session('old', last_intent=4))
+    clock.now = 6
+    store.put(Session('new'))
+    clock.now = 12
+
+    assert store.get('old') is None
+    assert store.get('new') is not None
+    clock.now = 30
+    assert store.expire() == 1
+    assert len(store) == 0
+    assert store.stats()['expirations'] == 2
+    assert store.bytes == 0
+
+def test_store_on_a_dbm_backend(tmp_path):
+    clock = Clock()
+    store = SessionStore(open_dbm_backend(str(tmp_path / 'sessions')), idle_timeout=10, clock=clock)
+    store.put(Session('a', last_intent=3, pending='lost card', turns=2))
+    store.put(Session('b'))
+    session = store.get('a')
+    assert (session.last_intent, session.pending, session.turns) == (3, 'lost card', 2)
+
+    clock.now = 20
+    assert store.expire() == 2
+    assert len(store) == 0
+    store.close()